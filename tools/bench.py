@@ -0,0 +1,283 @@
+"""Offline benchmark for ytdlp.py: a synthetic library, a fake YoutubeDL, downloader() end to end.
+
+    python3 tools/bench.py --preset medium
+    python3 tools/bench.py --preset large --json bench.jsonl
+    python3 tools/bench.py --preset medium --baseline bench.jsonl   # exit 1 on a regression
+
+Nothing touches the network: listings come from the generated data, downloads write dummy files."""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import shutil
+import threading
+import yaml
+
+os.environ.setdefault('TQDM_DISABLE', '1')  # progress bars would dominate the timings
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import ytdlp  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PRESETS = {  # name: (playlists, entries across all playlists)
+    'small': (10, 1000),
+    'medium': (100, 10000),
+    'large': (500, 50000),
+}
+
+# Timed per call; nested phases (check_stats contains _check_stats) are inclusive.
+PHASES = [
+    ('ItemDownloader', 'check_stats'),
+    ('ItemDownloader', '_check_special_files'),
+    ('ItemDownloader', '_check_stats'),
+    ('ItemDownloader', '_download_video'),
+    ('PlaylistData', '_load'),
+    ('SqlitePlaylistData', '_load'),
+    ('PlaylistData', 'save'),
+    ('SqlitePlaylistData', 'save'),
+    ('Stats', 'calculate_globals'),
+]
+
+WORDS = ['live', 'review', 'the', 'best', 'of', '2024', 'Part', 'how', 'to', 'build', 'a', 'Cafe',
+         'naïve', 'Übung', 'episode', 'FULL', 'guide', 'vs', 'with', 'music', 'mix', 'Tour', '—', 'why',
+         'ep.', 'highlights', '(official)', 'Q&A', 'day', 'in', 'my', 'life', '日本', 'travel', 'vlog']
+
+class FakeYoutubeDL:
+    """Stands in for yt_dlp.YoutubeDL (and PacedYoutubeDL): flat listings come from `listings`,
+    a download writes a dummy file, fires the hooks yt-dlp would and appends to the archive."""
+    listings = {}  # playlist url -> [entry]
+    videos = {}    # video url (without www.) -> entry
+    file_size = 4096
+    downloads = 0
+    lock = threading.Lock()
+
+    def __init__(self, params=None, limiter=None, **kwargs):
+        self.params = params or {}
+        self.limiter = limiter
+        self.hooks = {'progress': [], 'postprocessor': [], 'post': []}
+        self._archived = None
+        self.paced = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def sanitize_info(info):
+        return info
+
+    def add_progress_hook(self, hook):
+        self.hooks['progress'].append(hook)
+
+    def add_postprocessor_hook(self, hook):
+        self.hooks['postprocessor'].append(hook)
+
+    def add_post_hook(self, hook):
+        self.hooks['post'].append(hook)
+
+    def prepare_filename(self, info):
+        return os.path.join(os.path.expanduser(self.params['paths']['home']), ytdlp.sanitize_filename(info['title']) + '.' + info['ext'])
+
+    def extract_info(self, url, download=True, process=True, extra_info=None, **kwargs):
+        if self.limiter: self.paced += self.limiter.acquire(url)
+        if url in self.listings:
+            entries = self.listings[url]
+            if not download:
+                return {'playlist_count': len(entries), 'entries': list(entries) if process else iter(entries)}
+            for entry in entries: self._download(entry)
+            return {'playlist_count': len(entries), 'entries': entries}
+        return self._download(self.videos[url.replace("https://www.", "https://")])
+
+    def _archive(self):
+        if self._archived is None:
+            self._archived = set()
+            archive = self.params.get('download_archive')
+            if archive and os.path.exists(archive):
+                with open(archive, 'r') as file: self._archived = set(line.strip() for line in file)
+        return self._archived
+
+    def in_download_archive(self, info):
+        return f"youtube {info['id']}" in self._archive()
+
+    def _download(self, entry):
+        line = ytdlp._archive_line(entry['url'].replace("https://www.", "https://")).strip()
+        if line in self._archive(): return None
+        info = {'webpage_url': entry['url'], 'title': entry['title'], 'id': entry['id'], 'ext': 'mp4',
+                'duration': entry['duration'], 'channel': entry['channel']}
+        filename = self.prepare_filename(info)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'wb') as file: file.write(b'\0' * self.file_size)
+        for hook in self.hooks['progress']: hook({'status': 'finished', 'filename': filename, 'info_dict': info, 'downloaded_bytes': self.file_size})
+        for hook in self.hooks['post']: hook(filename)
+        with open(self.params['download_archive'], 'a') as file: file.write(line + "\n")
+        self._archived.add(line)
+        with self.lock: FakeYoutubeDL.downloads += 1
+        return info
+
+def instrument(timings):
+    """Wrap the PHASES methods so every call adds to timings[label] = [seconds, calls]."""
+    lock = threading.Lock()
+    def wrap(label, method):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try: return method(*args, **kwargs)
+            finally:
+                with lock:
+                    entry = timings.setdefault(label, [0.0, 0])
+                    entry[0] += time.perf_counter() - start
+                    entry[1] += 1
+        return timed
+    for cls_name, name in PHASES:
+        cls = getattr(ytdlp, cls_name)
+        if name in cls.__dict__: setattr(cls, name, wrap(f"{cls_name}.{name}", cls.__dict__[name]))
+
+def _title(rng, index):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 10))) + f" #{index}"
+
+def populate(path, playlists, entries, downloaded, seed):
+    """Write data.yml, the per-playlist state and the already-downloaded files. Playlist sizes
+    are skewed (a few big channels, many small playlists), listings are newest first."""
+    rng = random.Random(seed)
+    weights = [rng.paretovariate(1.2) for _ in range(playlists)]
+    sizes = [max(1, int(entries * weight / sum(weights))) for weight in weights]
+    data = []
+    for i, size in enumerate(sizes):
+        item = {'name': f"bench{i:03d}", 'url': f"https://youtube.com/playlist?list=BENCH{i:03d}"}
+        if i % 3 == 0: item['newest_first'] = True
+        data.append(item)
+        listing = []
+        for j in range(size):
+            video_id = f"{i:03d}{j:08d}"
+            entry = {'id': video_id, 'url': "https://www.youtube.com/watch?v=" + video_id, 'title': _title(rng, j),
+                     'channel': f"Channel {i}", 'duration': rng.randint(60, 3600)}
+            listing.append(entry)
+            FakeYoutubeDL.videos[entry['url'].replace("https://www.", "https://")] = entry
+        FakeYoutubeDL.listings[item['url']] = listing
+        playlist_data = ytdlp.open_playlist(item['name'])
+        outputdir = os.path.join(path, item['name'])
+        os.makedirs(outputdir, exist_ok=True)
+        for entry in listing[size - int(size * downloaded):]:
+            file = ytdlp.sanitize_filename(entry['title']) + '.mp4'
+            with open(os.path.join(outputdir, file), 'wb') as handle: handle.write(b'\0' * FakeYoutubeDL.file_size)
+            playlist_data.add({'url': entry['url'].replace("https://www.", "https://"), 'title': entry['title'], 'location': item['name'], 'file': file})
+        playlist_data.save()
+    with open(ytdlp.DATA_FILE, 'w') as file:
+        yaml.dump(data, file)
+    return data
+
+def peak_rss_mb():
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)  # bytes on macOS, KB on Linux
+
+def run(label, path, download, args):
+    """One downloader() run; returns its wall time, downloads and per-phase timings."""
+    timings = {}
+    instrument(timings)
+    FakeYoutubeDL.downloads = 0
+    start = time.perf_counter()
+    ytdlp.downloader(ytdlp.DATA_FILE, path, download=download, check_stats=True, update=download, wait=False,
+                     stats_file=ytdlp.STATS_FILE, console=False, file_output=True, list_info=False, nas=True,
+                     stats_jobs=args.stats_jobs, jobs=args.jobs)
+    wall = time.perf_counter() - start
+    restore()
+    return {'run': label, 'wall': round(wall, 3), 'downloads': FakeYoutubeDL.downloads, 'peak_rss_mb': peak_rss_mb(),
+            'phases': {name: {'seconds': round(seconds, 3), 'calls': calls} for name, (seconds, calls) in sorted(timings.items())}}
+
+_ORIGINALS = {}
+
+def restore():
+    for (cls_name, name), method in _ORIGINALS.items(): setattr(getattr(ytdlp, cls_name), name, method)
+
+def report(results, workload):
+    print(f"{workload['playlists']} playlists, {workload['entries']} entries, {workload['downloaded']:.0%} already downloaded")
+    for result in results:
+        print(f"\n{result['run']}: {result['wall']:.2f}s wall, {result['downloads']} downloads, peak RSS {result['peak_rss_mb']} MB")
+        for name, phase in result['phases'].items():
+            print(f"    {name:<40} {phase['seconds']:>8.3f}s  {phase['calls']:>8} calls")
+
+def compare(results, workload, baseline_file, max_slowdown):
+    """Check wall and phase times against the last baseline line for the same workload."""
+    baseline = None
+    with open(baseline_file, 'r') as file:
+        for line in file:
+            record = json.loads(line)
+            if record['workload'] == workload: baseline = record
+    if baseline is None:
+        print(f"\nNo baseline for this workload in {baseline_file}")
+        return True
+    ok = True
+    previous = {result['run']: result for result in baseline['results']}
+    for result in results:
+        before = previous.get(result['run'])
+        if not before: continue
+        pairs = [('wall', before['wall'], result['wall'])]
+        pairs += [(name, before['phases'][name]['seconds'], phase['seconds']) for name, phase in result['phases'].items() if name in before['phases']]
+        for name, old, new in pairs:
+            if old >= 0.05 and new > old * max_slowdown:  # ignore noise on near-zero phases
+                print(f"REGRESSION {result['run']} {name}: {old:.3f}s -> {new:.3f}s")
+                ok = False
+    if ok: print(f"\nNo regressions against {baseline_file} (max slowdown {max_slowdown}x)")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ytdlp.py offline against a synthetic library and a fake YoutubeDL.")
+    parser.add_argument('--preset', choices=PRESETS, default='small', help="Library size (default: small)")
+    parser.add_argument('--playlists', type=int, help="Override the preset's number of playlists")
+    parser.add_argument('--entries', type=int, help="Override the preset's total number of entries")
+    parser.add_argument('--downloaded', type=float, default=0.9, help="Fraction of each playlist already on disk (default: 0.9)")
+    parser.add_argument('--file-size', type=int, default=4, help="Dummy media file size in KB (default: 4)")
+    parser.add_argument('--stats-jobs', type=int, default=1, help="Passed to downloader() as -j")
+    parser.add_argument('--jobs', type=int, default=1, help="Passed to downloader() as --download-jobs")
+    parser.add_argument('--db', action='store_true', help="Use the SQLite state store")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="Append the results as one JSON line to this file")
+    parser.add_argument('--baseline', help="JSON lines file from an earlier --json run to compare against")
+    parser.add_argument('--max-slowdown', type=float, default=1.25, help="Allowed slowdown against --baseline (default: 1.25)")
+    parser.add_argument('--keep', action='store_true', help="Keep the generated work directory")
+    args = parser.parse_args()
+
+    playlists, entries = PRESETS[args.preset]
+    workload = {'playlists': args.playlists or playlists, 'entries': args.entries or entries,
+                'downloaded': args.downloaded, 'db': args.db, 'seed': args.seed}
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    output = os.path.abspath(args.json) if args.json else None
+
+    cwd, workdir = os.getcwd(), tempfile.mkdtemp(prefix='ytdlp-bench-')
+    os.chdir(workdir)
+    os.makedirs(ytdlp.DATA_PATH)
+    path = os.path.join(workdir, 'library')
+    ytdlp.TMP_DIR = os.path.join(workdir, 'tmp')
+    ytdlp._heavy_imports()  # before patching, or the first ItemDownloader would import the real ones over the fakes
+    ytdlp.YoutubeDL = ytdlp.PacedYoutubeDL = FakeYoutubeDL
+    if args.db: ytdlp.STATE_BACKEND = 'sqlite'
+    FakeYoutubeDL.file_size = args.file_size * 1024
+    for cls_name, name in PHASES:
+        cls = getattr(ytdlp, cls_name)
+        if name in cls.__dict__: _ORIGINALS[(cls_name, name)] = cls.__dict__[name]
+    try:
+        start = time.perf_counter()
+        populate(path, workload['playlists'], workload['entries'], workload['downloaded'], args.seed)
+        print(f"Generated library in {time.perf_counter() - start:.2f}s ({workdir})")
+        results = [run('stats+download (-sd)', path, True, args), run('stats, nothing new (-s)', path, False, args)]
+    finally:
+        os.chdir(cwd)
+        if not args.keep: shutil.rmtree(workdir, ignore_errors=True)
+    report(results, workload)
+    if output:
+        with open(output, 'a') as file: file.write(json.dumps({'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'workload': workload, 'results': results}) + "\n")
+    if baseline and not compare(results, workload, baseline, args.max_slowdown): sys.exit(1)
+
+if __name__ == "__main__":
+    main()
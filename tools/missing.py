@@ -1,24 +1,135 @@
+"""Collect the serials listed in every gamelist.Missing.Serial.txt under a tree, per system.
+
+    python3 tools/missing.py /mnt/nas/roms                      # per-system listing
+    python3 tools/missing.py /mnt/nas/roms --format csv -o missing.csv
+    python3 tools/missing.py /mnt/nas/roms --changes            # only what changed since the last scan
+
+The system is the name of the folder holding the file; serials are deduplicated and sorted, so
+two reports diff cleanly. Each complete scan is saved to <root>/.missing-serials.json for --changes."""
 import os
+import sys
+import csv
+import json
+import queue
 import argparse
+import threading
+
+TARGET = 'gamelist.Missing.Serial.txt'
+SNAPSHOT = '.missing-serials.json'  # in the scanned root: {system: [serial, ...]} from the last scan
+JOBS = 16                           # directory listings in flight; on a NAS each one is a round trip
+
+def _read_serials(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as file:
+        return [line.strip() for line in file if line.strip()]
+
+def find_files(root_path, jobs=JOBS):
+    """([(path, [serial, ...])] for every TARGET under root_path, [error, ...]). Workers share
+    one queue of directories: each lists a directory, queues its subdirectories for whichever
+    worker is free and reads the files it finds. Any error means the result is incomplete."""
+    found, errors, work = [], [], queue.Queue()
+
+    def error(path, e):
+        errors.append(f"{path}: {e}")
+        print(f"Error reading {path}: {e}", file=sys.stderr)
+
+    def worker():
+        while True:
+            path = work.get()
+            if path is None: return
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False): work.put(entry.path)
+                        elif entry.name == TARGET:
+                            try: found.append((entry.path, _read_serials(entry.path)))
+                            except OSError as e: error(entry.path, e)  # the rest of the directory still gets listed
+            except OSError as e:
+                error(path, e)
+            finally:
+                work.task_done()
+
+    work.put(root_path)
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(jobs)]
+    for thread in threads: thread.start()
+    work.join()
+    for thread in threads: work.put(None)
+    for thread in threads: thread.join()
+    return found, errors
+
+def build_report(found):
+    """{system: [serial, ...]}, deduplicated and sorted."""
+    systems = {}
+    for path, serials in found:
+        systems.setdefault(os.path.basename(os.path.dirname(path)), set()).update(serials)
+    return {system: sorted(serials) for system, serials in sorted(systems.items())}
+
+def diff_reports(old, new):
+    """{system: {'added': [...], 'resolved': [...]}} for the systems that changed."""
+    changes = {}
+    for system in sorted(set(old) | set(new)):
+        before, after = set(old.get(system, ())), set(new.get(system, ()))
+        if before != after: changes[system] = {'added': sorted(after - before), 'resolved': sorted(before - after)}
+    return changes
+
+def _load_snapshot(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _save_snapshot(path, report):
+    with open(path + '.tmp', 'w') as file:
+        json.dump(report, file)
+    os.replace(path + '.tmp', path)
 
-def find_and_print_files(root_path):
-    for dirpath, dirnames, filenames in os.walk(root_path):
-        for filename in filenames:
-            if filename == "gamelist.Missing.Serial.txt":
-                full_path = os.path.join(dirpath, filename)
-                print(f"\n--- Contents of: {full_path} ---")
-                try:
-                    with open(full_path, 'r', encoding='utf-8') as file:
-                        print(file.read())
-                except Exception as e:
-                    print(f"Error reading {full_path}: {e}")
+def write_report(report, fmt, out, changes=False):
+    if fmt == 'json':
+        json.dump(report, out, indent=2, ensure_ascii=False)
+        out.write('\n')
+    elif fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['system', 'serial', 'change'] if changes else ['system', 'serial'])
+        for system, value in report.items():
+            if changes:
+                for change in ('added', 'resolved'):
+                    writer.writerows([system, serial, change] for serial in value[change])
+            else:
+                writer.writerows([system, serial] for serial in value)
+    else:
+        for system, value in report.items():
+            if changes:
+                print(f"--- {system}: +{len(value['added'])} -{len(value['resolved'])}", file=out)
+                for serial in value['added']: print(f"+ {serial}", file=out)
+                for serial in value['resolved']: print(f"- {serial}", file=out)
+            else:
+                print(f"--- {system}: {len(value)} missing", file=out)
+                for serial in value: print(serial, file=out)
 
 def main():
-    parser = argparse.ArgumentParser(description="Recursively find and display gamelist.Missing.Serial.txt files")
+    parser = argparse.ArgumentParser(description="Recursively find gamelist.Missing.Serial.txt files and report the missing serials per system")
     parser.add_argument("path", help="Root directory to process")
+    parser.add_argument("--format", choices=['text', 'json', 'csv'], default='text', help="Report format (default text)")
+    parser.add_argument("-o", "--output", help="Write the report to a file instead of stdout")
+    parser.add_argument("--changes", action='store_true', help="Only report serials added or resolved since the previous scan")
+    parser.add_argument("--snapshot", help=f"Where the previous scan is kept (default <path>/{SNAPSHOT})")
+    parser.add_argument("-j", "--jobs", type=int, default=JOBS, help=f"Parallel directory listings (default {JOBS})")
     args = parser.parse_args()
 
-    find_and_print_files(args.path)
+    snapshot = args.snapshot or os.path.join(args.path, SNAPSHOT)
+    found, errors = find_files(args.path, max(1, args.jobs))
+    report = build_report(found)
+    if args.changes: result = diff_reports(_load_snapshot(snapshot), report)
+    else: result = report
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as out:
+            write_report(result, args.format, out, args.changes)
+    else:
+        write_report(result, args.format, sys.stdout, args.changes)
+    if errors:  # a partial scan would show the unread serials as resolved, then added again
+        print(f"{len(errors)} error(s) while scanning; the report is incomplete and {snapshot} was not updated", file=sys.stderr)
+        sys.exit(1)
+    _save_snapshot(snapshot, report)
 
 if __name__ == "__main__":
     main()
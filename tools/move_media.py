@@ -1,45 +1,174 @@
+"""Copy gamelists and media folders from roms/<system>/ to gamelists/<system>/ and media/<system>/.
+
+    python3 tools/move_media.py /mnt/nas/library             # sync
+    python3 tools/move_media.py /mnt/nas/library --dry-run   # what would be transferred
+
+Incremental: a manifest (<base>/.media-sync.json) remembers the size and mtime of every file
+already synced, so unchanged files cost one stat of the source. Delete it to force a full
+comparison against the destination."""
 import os
+import json
 import shutil
+import hashlib
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+MANIFEST = '.media-sync.json'  # in the base path: {destination relpath: [size, mtime_ns, sha256 or null]}
+JOBS = 8                       # parallel scans and copies; network shares like more than one in flight
+FICLONE = 0x40049409           # Linux ioctl: share the source's blocks (btrfs, xfs, ...)
+HASH_CHUNK = 1 << 20
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _walk(path):
+    """Every file under path, as os.DirEntry."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False): yield from _walk(entry.path)
+            elif entry.is_file(): yield entry
 
-def process_roms(base_path):
+def _scan_system(base_path, dir_name):
+    """(source, destination) pairs for one system: its gamelist.xml and its media folder."""
+    dir_path = os.path.join(base_path, 'roms', dir_name)
+    pairs = []
+    gamelist_file = os.path.join(dir_path, 'gamelist.xml')
+    if os.path.isfile(gamelist_file):
+        pairs.append((gamelist_file, os.path.join('gamelists', dir_name, 'gamelist.xml')))
+    media_folder = os.path.join(dir_path, 'media')
+    if os.path.isdir(media_folder):
+        for entry in _walk(media_folder):
+            pairs.append((entry.path, os.path.join('media', dir_name, os.path.relpath(entry.path, media_folder))))
+    return pairs
+
+def _unchanged(src, st, dst, entry, checksum, touch):
+    """Whether dst already holds src: the manifest says so, or (no entry) the destination matches
+    in size and mtime as copy2 leaves it. With checksum, a same-size file whose mtime moved still
+    counts as unchanged when its content hash does (and with touch, dst gets src's mtime so the
+    next run without a manifest agrees). Returns (unchanged, sha256 or None)."""
+    if entry is None:
+        try:
+            dst_st = os.stat(dst)
+        except FileNotFoundError:
+            return False, None
+        entry = [dst_st.st_size, dst_st.st_mtime_ns, None]
+    if entry[0] != st.st_size: return False, None
+    if entry[1] == st.st_mtime_ns: return True, entry[2]
+    if not checksum or not os.path.exists(dst): return False, None
+    sha = _sha256(src)
+    if sha != (entry[2] or _sha256(dst)): return False, None
+    if touch: shutil.copystat(src, dst)
+    return True, sha
+
+def _transfer(src, dst, link):
+    """Copy src over dst via a temporary file, so an interrupted run never leaves half a file.
+    link: 'hard' hardlinks, 'reflink' clones the blocks where the filesystem can (falling back
+    to a copy), 'none' always copies."""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + '.part'
+    if os.path.lexists(tmp): os.remove(tmp)
+    if link == 'hard':
+        os.link(src, tmp)
+    else:
+        cloned = False
+        if link == 'reflink' and fcntl:
+            with open(src, 'rb') as s, open(tmp, 'wb') as d:
+                try:
+                    fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+                    cloned = True
+                except OSError:
+                    pass  # different filesystems, or no reflink support
+        if cloned: shutil.copystat(src, tmp)
+        else: shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+def _load_manifest(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _save_manifest(path, manifest):
+    with open(path + '.tmp', 'w') as file:
+        json.dump(manifest, file)
+    os.replace(path + '.tmp', path)
+
+def process_roms(base_path, dry_run=False, jobs=JOBS, link='reflink', checksum=False):
     roms_path = os.path.join(base_path, 'roms')
-    media_path = os.path.join(base_path, 'media')
-    gamelist_path = os.path.join(base_path, 'gamelists')
 
     if not os.path.isdir(roms_path):
         print(f"Error: {roms_path} does not exist or is not a directory.")
         return
 
-    for dir_name in os.listdir(roms_path):
-        dir_path = os.path.join(roms_path, dir_name)
-        if not os.path.isdir(dir_path):
-            continue  # Skip files, only process directories
+    systems = sorted(d.name for d in os.scandir(roms_path) if d.is_dir())  # skip files, only process directories
+    if link == 'hard':
+        for folder in ('media', 'gamelists'): os.makedirs(os.path.join(base_path, folder), exist_ok=True)
+        if any(os.stat(roms_path).st_dev != os.stat(os.path.join(base_path, folder)).st_dev for folder in ('media', 'gamelists')):
+            print("Error: --link hard needs roms, media and gamelists on the same filesystem.")
+            return
+    manifest_path = os.path.join(base_path, MANIFEST)
+    manifest = _load_manifest(manifest_path)
+
+    def check(pair):
+        src, rel = pair
+        st = os.stat(src)
+        unchanged, sha = _unchanged(src, st, os.path.join(base_path, rel), manifest.get(rel), checksum, not dry_run)
+        return src, rel, st, unchanged, sha
 
-        dest_dir = os.path.join(media_path, dir_name)
-        os.makedirs(dest_dir, exist_ok=True)
+    with ThreadPoolExecutor(jobs) as pool:
+        todo = {}  # system -> [(src, rel, stat, sha)]
+        for dir_name, pairs in zip(systems, pool.map(lambda d: _scan_system(base_path, d), systems)):
+            todo[dir_name] = []
+            for src, rel, st, unchanged, sha in pool.map(check, pairs):
+                if unchanged: manifest[rel] = [st.st_size, st.st_mtime_ns, sha]
+                else: todo[dir_name].append((src, rel, st, sha))
 
-        dest_dir_gamelist = os.path.join(gamelist_path, dir_name)
-        os.makedirs(dest_dir_gamelist, exist_ok=True)
+        total_files = sum(len(files) for files in todo.values())
+        total_bytes = sum(st.st_size for files in todo.values() for _, _, st, _ in files)
+        if dry_run:
+            for dir_name, files in todo.items():
+                if files: print(f"{dir_name}: {len(files)} file(s), {sum(st.st_size for _, _, st, _ in files) / 1e6:.1f} MB")
+            print(f"Would transfer {total_files} file(s), {total_bytes / 1e6:.1f} MB.")
+            return
 
-        # Copy gamelist.xml if exists
-        gamelist_file = os.path.join(dir_path, 'gamelist.xml')
-        if os.path.isfile(gamelist_file):
-            shutil.copy2(gamelist_file, os.path.join(dest_dir_gamelist, 'gamelist.xml'))
-            print(f"Copied gamelist.xml for {dir_name}")
+        def copy(job):
+            src, rel, st, sha = job
+            _transfer(src, os.path.join(base_path, rel), link)
+            return rel, [st.st_size, st.st_mtime_ns, sha]
 
-        # Copy media folder if exists
-        media_folder = os.path.join(dir_path, 'media')
-        if os.path.isdir(media_folder):
-            shutil.copytree(media_folder, dest_dir, dirs_exist_ok=True)
-            print(f"Copied media for {dir_name}")
+        try:
+            for dir_name, files in todo.items():
+                if not files: continue
+                for rel, entry in pool.map(copy, files):
+                    manifest[rel] = entry
+                print(f"Copied {len(files)} file(s) for {dir_name}")
+        finally:
+            _save_manifest(manifest_path, manifest)  # keep what did get copied
+    print(f"Transferred {total_files} file(s), {total_bytes / 1e6:.1f} MB.")
 
 def main():
     parser = argparse.ArgumentParser(description="Copy gamelists and media folders from roms to media directory.")
     parser.add_argument('path', help="Base path where 'roms' directory is located.")
+    parser.add_argument('-n', '--dry-run', action='store_true', help="Only report what would be transferred")
+    parser.add_argument('-j', '--jobs', type=int, default=JOBS, help=f"Parallel scans and copies (default {JOBS})")
+    parser.add_argument('--link', choices=['reflink', 'hard', 'none'], default='reflink',
+                        help="reflink: clone blocks when the filesystem supports it, else copy (default); "
+                             "hard: hardlink instead of copying (same filesystem only); none: always copy")
+    parser.add_argument('--checksum', action='store_true',
+                        help="Compare content hashes when only the mtime changed, and record them in the manifest")
     args = parser.parse_args()
 
-    process_roms(args.path)
+    process_roms(args.path, args.dry_run, args.jobs, args.link, args.checksum)
 
 if __name__ == "__main__":
     main()
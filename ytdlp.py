@@ -1,9 +1,33 @@
-from tqdm.auto import tqdm, trange # type: ignore
-import yaml, ssl, os, argparse, re, shutil, time # type: ignore
-import ntpath # type: ignore
-from yt_dlp import YoutubeDL, postprocessor # type: ignore
-from yt_dlp.utils import sanitize_filename # type: ignore
-from yt_dlp.version import __version__ as YTDLP_VERSION # type: ignore
+import time # type: ignore
+_IMPORT_STARTED = time.perf_counter()
+import yaml, os, argparse, re, shutil, json, sqlite3, threading # type: ignore
+import ntpath, urllib.parse, contextlib, hashlib, heapq # type: ignore
+from concurrent.futures import ThreadPoolExecutor # type: ignore
+
+# yt-dlp (extractor registry, postprocessors) and tqdm take a few hundred ms to import, and
+# --triage / --review / the state tools never touch them: _heavy_imports() brings them in the
+# first time a stats or download run needs them.
+YoutubeDL = PacedYoutubeDL = postprocessor = sanitize_filename = YTDLP_VERSION = None
+tqdm = trange = None
+IMPORT_TIMES = {}  # module -> seconds spent importing it (--profile-startup)
+
+def _heavy_imports():
+    """Import yt-dlp and tqdm (once), and resolve the options that name yt-dlp objects."""
+    global YoutubeDL, PacedYoutubeDL, postprocessor, sanitize_filename, DownloadCancelled, YTDLP_VERSION, tqdm, trange
+    if IMPORT_TIMES: return
+    start = time.perf_counter()
+    from yt_dlp import YoutubeDL, postprocessor # type: ignore
+    from yt_dlp.utils import sanitize_filename, DownloadCancelled # type: ignore
+    from yt_dlp.version import __version__ as YTDLP_VERSION # type: ignore
+    IMPORT_TIMES['yt_dlp'] = time.perf_counter() - start
+    start = time.perf_counter()
+    from tqdm.auto import tqdm, trange # type: ignore
+    IMPORT_TIMES['tqdm'] = time.perf_counter() - start
+    PacedYoutubeDL = _paced_youtube_dl(YoutubeDL)
+    for options in (VIDEO_OPTIONS, AUDIO_OPTIONS):
+        for pp in options['postprocessors']:
+            if 'actions' in pp:
+                pp['actions'] = [(getattr(postprocessor.metadataparser.MetadataParserPP, action) if isinstance(action, str) else action, *args) for action, *args in pp['actions']]
 
 YTDLP_STALE_DAYS = 30  # YouTube anti-bot changes weekly; an old yt-dlp is the #1 cause of failures
 
@@ -17,10 +41,12 @@ DATA_PATH = "data"
 if os.name == 'posix':
     DEFAULT_PATH, NAS_PATH = "~/Downloads/youtube", "/Volumes/media/youtube"
     TMP_DIR = "~/Downloads/_tmp/"
+    STAGE_DIR = "~/Downloads/_outgoing/"
     import unicodedata
 else:
     DEFAULT_PATH, NAS_PATH = "X:\\youtube", "X:\\youtube"
     TMP_DIR = os.path.join(os.environ['USERPROFILE'], "Downloads\\_tmp")
+    STAGE_DIR = os.path.join(os.environ['USERPROFILE'], "Downloads\\_outgoing")
     
 OUTTMPL_DEFAULT = '%(title)s.%(ext)s'
 OUTTMPL_CHANNEL = '[%(uploader)s] - '
@@ -62,22 +88,88 @@ STATS_OPTIONS = {
 STATS_FETCH_RETRIES = 3      # attempts to get a full playlist when YouTube truncates the page
 STATS_FETCH_RETRY_WAIT = 5   # seconds to wait between retries
 
+# Incremental listing for newest-first sources ('channel: true' or 'newest_first: true'):
+# read the listing lazily and stop once we're back among videos we already know.
+INCREMENTAL_STOP_AFTER = 10  # consecutive known videos that end an incremental listing
+INCREMENTAL_FULL_EVERY = 10  # every Nth listing is still a full one (deletion detection, backfill)
+
 # Rough storage estimate for to-be-downloaded videos, from each video's duration (already
-# in the flat listing, so no extra requests). Assumed bitrates for the formats we grab.
+# in the flat listing, so no extra requests). Assumed bitrates for the formats we grab, used
+# until the SizeModel has measured a channel or playlist.
 EST_VIDEO_MBPS = 3.5         # bestvideo[ext=mp4]+bestaudio[ext=m4a] ~ 1080p H.264
 EST_AUDIO_MBPS = 0.128       # bestaudio[ext=m4a]
+SIZE_MODEL_FILE = os.path.join(DATA_PATH, 'sizes.yml')
+SIZE_MODEL_MIN_VIDEOS = 3    # measured videos before a channel's / playlist's own bitrate is trusted
+SIZE_MODEL_WINDOW = 50       # older measurements fade out past this many, so a switch to 4K shows up
+
+class SizeModel:
+    """Measured bitrates: the bytes and duration of every downloaded file, summed per
+    playlist and per channel (and kind: a channel's mp3s say nothing about its videos).
+    A record is estimated from its channel if that has enough measurements, else from its
+    playlist, else from EST_VIDEO_MBPS / EST_AUDIO_MBPS."""
+    def __init__(self, path=SIZE_MODEL_FILE):
+        self.path = path
+        self.model = {'playlists': {}, 'channels': {}}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r') as file: self.model.update(yaml.safe_load(file) or {})
+
+    @staticmethod
+    def _kind(record):
+        return 'audio' if record.get('mp3') else 'video'
+
+    def _add(self, sums, size, seconds):
+        sums['bytes'] = sums.get('bytes', 0) + size
+        sums['seconds'] = sums.get('seconds', 0) + seconds
+        sums['videos'] = sums.get('videos', 0) + 1
+        if sums['videos'] > SIZE_MODEL_WINDOW:
+            scale = SIZE_MODEL_WINDOW / sums['videos']
+            sums.update(bytes=int(sums['bytes'] * scale), seconds=round(sums['seconds'] * scale, 1), videos=SIZE_MODEL_WINDOW)
+
+    def observe(self, playlist, channel, kind, size, seconds):
+        """A downloaded file of size bytes and seconds duration."""
+        if not size or not seconds: return
+        with self.lock:
+            self._add(self.model['playlists'].setdefault(playlist, {}), size, seconds)
+            if channel: self._add(self.model['channels'].setdefault(kind, {}).setdefault(channel, {}), size, seconds)
+
+    def mbps(self, record):
+        """Bitrate to assume for a submitted / pending record."""
+        with self.lock:
+            for sums in (self.model['channels'].get(self._kind(record), {}).get(record.get('channel')),
+                         self.model['playlists'].get(record.get('name'))):
+                if sums and sums['videos'] >= SIZE_MODEL_MIN_VIDEOS and sums['seconds'] > 0:
+                    return sums['bytes'] * 8 / 1e6 / sums['seconds']
+        return EST_AUDIO_MBPS if record.get('mp3') else EST_VIDEO_MBPS
+
+    def save(self):
+        with self.lock: text = yaml.dump(self.model)
+        with open(self.path + '.tmp', 'w') as file: file.write(text)
+        os.replace(self.path + '.tmp', self.path)
+
+# The lazy singletons are first asked for from worker threads too (-j, --download-jobs):
+# building two would mean two models, or two SQLite connections fighting over the lock.
+_singletons_lock = threading.RLock()
+
+_size_model = None
+
+def size_model():
+    global _size_model
+    if _size_model is None:
+        with _singletons_lock:
+            if _size_model is None: _size_model = SizeModel()
+    return _size_model
 
 def estimate_gb(records):
     """Estimated download size (GB) for a list of submitted records, via duration x bitrate."""
     gb = 0.0
     for r in records:
-        mbps = EST_AUDIO_MBPS if r.get('mp3') else EST_VIDEO_MBPS
-        gb += (r.get('duration') or 0) / 3600 * mbps * 0.45  # 1 Mbps ~= 0.45 GB/hour
+        gb += (r.get('duration') or 0) / 3600 * size_model().mbps(r) * 0.45  # 1 Mbps ~= 0.45 GB/hour
     return gb
 
 VIDEO_OPTIONS = {
     'postprocessors': [
-        {'actions': [(postprocessor.metadataparser.MetadataParserPP.interpretter,
+        {'actions': [('interpretter',  # MetadataParserPP.interpretter, resolved by _heavy_imports()
                                   'description',
                                   '(?s)(?P<meta_comment>.+)')],
                      'key': 'MetadataParser',
@@ -94,7 +186,7 @@ VIDEO_OPTIONS = {
 
 AUDIO_OPTIONS = {
     'postprocessors': [
-        {'actions': [(postprocessor.metadataparser.MetadataParserPP.interpretter,
+        {'actions': [('interpretter',  # MetadataParserPP.interpretter, resolved by _heavy_imports()
                                   'description',
                                   '(?s)(?P<meta_comment>.+)')],
                      'key': 'MetadataParser',
@@ -115,20 +207,167 @@ DOWNLOAD_OPTIONS_WAIT = {
     'sleep_interval_subtitles': 2,
 }
 
+# Seconds between requests across all --stats-jobs listings combined (lifted by -w): however
+# many run at once, together they stay at the pace of a single one.
+STATS_REQUEST_INTERVAL = DOWNLOAD_OPTIONS_WAIT['sleep_interval_requests']
+
+class RateLimiter:
+    """Spaces requests from any number of threads at least `interval` seconds apart."""
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def acquire(self, url=None):
+        """Wait for our slot; returns the seconds spent waiting."""
+        if self.interval <= 0: return 0
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay <= 0: return 0
+        time.sleep(delay)
+        return delay
+
+    def set_interval(self, interval):
+        self.interval = interval
+
+# Hosts whose requests count against the request-rate ceiling: page, API and listing requests.
+# Media hosts (googlevideo.com) are left alone - 'ratelimit' already caps their bandwidth, and
+# pacing every media chunk would throttle downloads rather than requests.
+PACED_HOSTS = ('youtube.com', 'youtu.be')
+
+class HostRateLimiter:
+    """A RateLimiter per paced host, shared by every worker; other hosts pass straight through."""
+    def __init__(self, interval):
+        self.interval = interval
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url=None):
+        host = urllib.parse.urlsplit(url or '').hostname or ''
+        paced = next((h for h in PACED_HOSTS if host == h or host.endswith('.' + h)), None)
+        if paced is None: return 0
+        with self._lock:
+            limiter = self._limiters.setdefault(paced, RateLimiter(self.interval))
+        return limiter.acquire()
+
+    def set_interval(self, interval):
+        with self._lock:
+            self.interval = interval
+            for limiter in self._limiters.values(): limiter.set_interval(interval)
+
+# Adaptive pacing (AIMD). The sleeps in DOWNLOAD_OPTIONS_WAIT (and the request-rate limits built
+# on them) are scaled by a learned 'pace' factor: every clean download shaves PACE_STEP off it,
+# every bot check / HTTP 429 multiplies it by PACE_BACKOFF. It persists in PACING_FILE, so each
+# run starts from what the last one learned instead of from the fixed defaults.
+PACING_FILE = os.path.join(DATA_PATH, 'pacing.yml')
+PACE_MIN, PACE_MAX = 0.1, 8.0
+PACE_STEP = 0.02             # additive decrease per successful download
+PACE_BACKOFF = 2.0           # multiplicative increase per pushback signal
+PACE_HOLDOFF = 60            # seconds: one incident often logs several errors; count it once
+PACE_MAX_RATELIMIT = 4       # never go past this multiple of DOWNLOAD_OPTIONS_WAIT['ratelimit']
+
+class AdaptiveThrottle:
+    """The learned pace, shared by every download in the process (see PACING_FILE)."""
+    def __init__(self, path=PACING_FILE):
+        self.path = path
+        self.pace = 1.0
+        self.penalized_at = 0.0
+        self.lock = threading.Lock()
+        self.limiters = []   # (limiter, base interval) pairs that follow the pace
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                self.pace = min(PACE_MAX, max(PACE_MIN, float((yaml.safe_load(file) or {}).get('pace', 1.0))))
+
+    def options(self):
+        """DOWNLOAD_OPTIONS_WAIT at the current pace."""
+        with self.lock: pace = self.pace
+        opts = {key: value * pace for key, value in DOWNLOAD_OPTIONS_WAIT.items() if key.startswith('sleep_') or key == 'max_sleep_interval'}
+        opts['ratelimit'] = int(min(DOWNLOAD_OPTIONS_WAIT['ratelimit'] / pace, DOWNLOAD_OPTIONS_WAIT['ratelimit'] * PACE_MAX_RATELIMIT))
+        return opts
+
+    def apply(self, params):
+        """Re-pace a live YoutubeDL between videos (yt-dlp reads these per download/request).
+        Only keys the params already carry are touched, so -w runs stay unpaced."""
+        params.update({key: value for key, value in self.options().items() if key in params})
+
+    def track(self, limiter, base_interval):
+        """Keep a RateLimiter's interval at base_interval x pace."""
+        with self.lock:
+            self.limiters.append((limiter, base_interval))
+            limiter.set_interval(base_interval * self.pace)
+
+    def success(self):
+        self._set_pace(lambda pace: pace - PACE_STEP)
+
+    def penalize(self):
+        with self.lock:
+            if time.monotonic() - self.penalized_at < PACE_HOLDOFF: return
+            self.penalized_at = time.monotonic()
+        self._set_pace(lambda pace: pace * PACE_BACKOFF)
+
+    def _set_pace(self, change):
+        with self.lock:
+            self.pace = min(PACE_MAX, max(PACE_MIN, change(self.pace)))
+            for limiter, base_interval in self.limiters:
+                if base_interval > 0: limiter.set_interval(base_interval * self.pace)
+
+    def save(self):
+        with self.lock: pace = self.pace
+        with open(self.path, 'w') as file:
+            yaml.dump({'pace': round(pace, 3), 'updated': time.strftime('%Y-%m-%d %H:%M:%S')}, file)
+
+_throttle = None
+
+def throttle():
+    global _throttle
+    if _throttle is None:
+        with _singletons_lock:
+            if _throttle is None: _throttle = AdaptiveThrottle()
+    return _throttle
+
+def _paced_youtube_dl(base):
+    """PacedYoutubeDL, built on the YoutubeDL class once yt-dlp is imported."""
+    class PacedYoutubeDL(base):
+        """YoutubeDL whose every HTTP request (listing pages included) waits on a shared limiter.
+        `paced` adds up the seconds it spent waiting."""
+        def __init__(self, params=None, limiter=None, **kwargs):
+            super().__init__(params, **kwargs)
+            self.limiter = limiter
+            self.paced = 0.0
+
+        def urlopen(self, req):
+            if self.limiter: self.paced += self.limiter.acquire(req if isinstance(req, str) else req.url)
+            return super().urlopen(req)
+    return PacedYoutubeDL
+
 class DownloadErrorException(Exception):
     """Base class for other exceptions"""
     pass
 
+def _pushback(msg):
+    """Whether a yt-dlp message means YouTube wants us to slow down."""
+    return 'not a bot' in msg or 'HTTP Error 429' in msg or 'Too Many Requests' in msg
+
+_SLEEP_RE = re.compile(r'Sleeping (\d+(?:\.\d+)?) seconds')  # yt-dlp's sleep_interval* notices
+
 class TQDMLogger:
-    def __init__(self, pbar):
+    def __init__(self, pbar, stats=None):
         self.pbar = pbar
-    def debug(self, _):
-        pass
+        self.stats = stats
+        self.slept = 0.0  # seconds yt-dlp announced sleeping through this logger
+    def debug(self, msg):
+        match = _SLEEP_RE.search(msg)
+        if not match: return
+        self.slept += float(match.group(1))
+        if self.stats: self.stats.add_time('sleep', float(match.group(1)))
     def info(self, _):
         pass
-    def warning(self, _):
-        pass
+    def warning(self, msg):
+        if _pushback(msg): throttle().penalize()  # retried 429s only ever show up as warnings
     def error(self, msg):
+        if _pushback(msg): throttle().penalize()
         if 'Private video' in msg: return
         if 'Video unavailable' in msg: return
         if 'members' in msg: return
@@ -142,19 +381,226 @@ class TQDMLogger:
             return
         self.pbar.write(f"    {msg}")
 
+_UNSAFE_FILENAME_CHARS = [r'"', r"\*", r"\.", r"\/", r"\:", r'"', r"\<", r"\>", r"\?", r"\\", r"\|", r"\\\\"]
+_UNSAFE_FILENAME_RE = re.compile("|".join([chr(i) for i in range(31)] + _UNSAFE_FILENAME_CHARS), re.UNICODE)
+_SAFE_CHARS = str.maketrans({'/': '', ':': '', '*': '', '"': '_', '<': '', '>': '', '|': '', '?': ''})
+
 def safe_filename(s: str, max_length: int = 255) -> str:
     """Sanitize a string making it safe to use as a filename."""
-    characters = [r'"', r"\*", r"\.", r"\/", r"\:", r'"', r"\<", r"\>", r"\?", r"\\", r"\|", r"\\\\"]
-    regex = re.compile("|".join([chr(i) for i in range(31)] + characters), re.UNICODE)
-    filename = regex.sub("", s)
+    filename = _UNSAFE_FILENAME_RE.sub("", s)
     if len(filename) <= max_length:
         return filename
     # Trim to the last whole word so we don't cut a word in half at the limit.
     return filename[:max_length].rsplit(" ", 1)[0]
 
+def _nfc(name):
+    """macOS hands back NFD filenames; compare everything in NFC."""
+    return unicodedata.normalize('NFC', name) if os.name == 'posix' else name
+
+FILENAME_INDEX_GRAM = 8      # chars per indexed slice of a filename
+FILENAME_INDEX_STRIDE = 4    # index a slice every N chars (memory / lookups trade-off)
+
+class FilenameIndex:
+    """Finds which file in a directory contains a video title, without scanning every file.
+
+    Each filename is indexed under the GRAM-char slices starting at every STRIDE-th position.
+    Any occurrence of a title (at least GRAM+STRIDE-1 chars) covers one of those positions
+    within its first STRIDE chars, so probing the title's first STRIDE slices finds every
+    file that can contain it. Candidates are then confirmed with a plain substring check, in
+    listing order, so the answer is exactly the first file containing the title - the same
+    as a linear scan, which keeps the '[uploader] - ' / 'playlist_index - ' prefixes from
+    OUTTMPL_CHANNEL / OUTTMPL_COUNT matching."""
+    def __init__(self, names):
+        self.names = [_nfc(name) for name in names]
+        self._members = set(self.names)
+        self._slices = {}
+        for i, name in enumerate(self.names):
+            for start in range(0, len(name) - FILENAME_INDEX_GRAM + 1, FILENAME_INDEX_STRIDE):
+                bucket = self._slices.setdefault(name[start:start + FILENAME_INDEX_GRAM], [])
+                if not bucket or bucket[-1] != i: bucket.append(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in self._members
+
+    def find(self, title):
+        """First filename containing `title`, or None."""
+        title = _nfc(title)
+        if len(title) < FILENAME_INDEX_GRAM + FILENAME_INDEX_STRIDE - 1:
+            return next((name for name in self.names if title in name), None)  # too short to index
+        candidates = set()
+        for offset in range(FILENAME_INDEX_STRIDE):
+            candidates.update(self._slices.get(title[offset:offset + FILENAME_INDEX_GRAM], ()))
+        return next((self.names[i] for i in sorted(candidates) if title in self.names[i]), None)
+
+    def match(self, title):
+        """The existing file for a video title: the safe_filename form first, then yt-dlp's
+        own sanitize_filename form (what the outtmpl actually writes)."""
+        return self.find(safe_filename(title.translate(_SAFE_CHARS))) or self.find(sanitize_filename(title))
+
+SCAN_CACHE_FILE = os.path.join(DATA_PATH, 'scans.json')
+SCAN_JOBS = 8                # output directories listed at once by the pre-scan (a NAS stat is a round trip)
+SCAN_RACY_SECONDS = 2        # a directory changed this recently may change again within the same mtime tick
+
+class DirectoryCache:
+    """Snapshots of the output directories: the names of their regular files, NFC-normalized
+    once, kept on disk (SCAN_CACHE_FILE) with the directory's mtime. Adding, removing or
+    renaming a file bumps that mtime, so an unchanged directory costs one stat per run
+    instead of a listing plus a stat per file - over SMB each of those is a round trip."""
+    def __init__(self, path=SCAN_CACHE_FILE):
+        self.path = path
+        self.dirs = {}  # expanded directory -> {'mtime': st_mtime_ns, 'files': [name, ...]}
+        self.lock = threading.Lock()
+        self.changed = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as file: self.dirs = json.load(file)
+            except ValueError: pass  # torn write: rescan everything once
+
+    def files(self, directory):
+        """Regular files in directory (NFC names), or None if it doesn't exist."""
+        directory = os.path.expanduser(directory)
+        try: mtime = os.stat(directory).st_mtime_ns
+        except OSError: return None
+        with self.lock: cached = self.dirs.get(directory)
+        if cached and cached['mtime'] == mtime: return cached['files']
+        with os.scandir(directory) as entries:  # d_type: no stat per entry
+            files = [_nfc(entry.name) for entry in entries if entry.is_file()]
+        if time.time() - mtime / 1e9 < SCAN_RACY_SECONDS: mtime = None  # don't trust it next time
+        with self.lock:
+            self.dirs[directory] = {'mtime': mtime, 'files': files}
+            self.changed = True
+        return files
+
+    def prescan(self, directories, jobs=SCAN_JOBS):
+        """Snapshot these directories in parallel (the stats pass then reads them from memory)."""
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool: list(pool.map(self.files, directories))
+
+    def save(self):
+        if not self.changed: return
+        with self.lock: text = json.dumps(self.dirs)
+        with open(self.path + '.tmp', 'w') as file: file.write(text)
+        os.replace(self.path + '.tmp', self.path)
+        self.changed = False
+
+_directory_cache = None
+
+def directory_cache():
+    global _directory_cache
+    if _directory_cache is None:
+        with _singletons_lock:
+            if _directory_cache is None: _directory_cache = DirectoryCache()
+    return _directory_cache
+
+LISTING_CACHE_DIR = os.path.join(DATA_PATH, 'listings')
+LISTING_TTL = 3600           # seconds a cached flat listing is reused by the next stats pass (--listing-ttl, --refresh)
+LISTING_FIELDS = ('id', 'url', 'title', 'channel', 'duration')  # all the stats pass reads from an entry
+
+class ListingCache:
+    """Flat playlist listings kept on disk (LISTING_CACHE_DIR, one gzipped JSON file per
+    playlist URL), so a second -s within the TTL classifies against the same listing
+    without asking YouTube again. Only the entry fields the stats pass reads are kept. A
+    listing that was cut short (incremental) only stands in for another incremental one.
+    offline (--replay) serves whatever is cached, however old, and never goes to the
+    network: recorded listings as a fixture for the stats path."""
+    def __init__(self, ttl=LISTING_TTL, offline=False, path=LISTING_CACHE_DIR):
+        self.ttl, self.offline, self.path = ttl, offline, path
+
+    def _file(self, url):
+        return os.path.join(self.path, hashlib.sha1(url.encode()).hexdigest()[:16] + '.json.gz')
+
+    def get(self, url, incremental=False):
+        """(entries, playlist_count, age in seconds) of a usable cached listing, or None."""
+        import gzip
+        file = self._file(url)
+        if not os.path.exists(file) or (self.ttl <= 0 and not self.offline): return None
+        try:
+            with gzip.open(file, 'rt', encoding='utf-8') as handle: listing = json.load(handle)
+        except (OSError, ValueError): return None  # torn or foreign file: list again
+        age = time.time() - listing['fetched']
+        if not self.offline and (age > self.ttl or (listing['incremental'] and not incremental)): return None
+        return listing['entries'], listing['playlist_count'], age
+
+    def put(self, url, entries, playlist_count, incremental=False):
+        import gzip
+        os.makedirs(self.path, exist_ok=True)
+        listing = {'url': url, 'fetched': time.time(), 'playlist_count': playlist_count, 'incremental': incremental,
+                   'entries': [{key: entry.get(key) for key in LISTING_FIELDS} if entry else None for entry in entries]}
+        file = self._file(url)
+        with gzip.open(file + '.tmp', 'wt', encoding='utf-8') as handle: json.dump(listing, handle)
+        os.replace(file + '.tmp', file)
+
+def _prom_label(value):
+    """A Prometheus label value, escaped."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class VideoRecord:
+    """One listed video as the stats pass sees it: its own fields in slots and a reference to
+    its data.yml item (name, mp3, ...) rather than a copy of it, so a 100k-entry run doesn't
+    hold 100k copies of the item. Reads like the dict it stands for (record['title'],
+    record.get('mp3')); as_dict() is that dict, for YAML and the pending queue."""
+    __slots__ = ('item', 'url', 'title', 'channel', 'duration', 'playlist_index')
+    FIELDS = __slots__[1:]
+
+    def __init__(self, item, url, title, channel, duration, playlist_index):
+        self.item, self.url, self.title, self.channel, self.duration, self.playlist_index = item, url, title, channel, duration, playlist_index
+
+    def __getitem__(self, key):
+        return getattr(self, key) if key in self.FIELDS else self.item[key]
+
+    def __contains__(self, key):
+        return key in self.FIELDS or key in self.item
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else self.item.get(key, default)
+
+    def as_dict(self):
+        record = {key: value for key, value in self.item.items() if key != 'channel'}  # the item's channel flag
+        record.update((key, getattr(self, key)) for key in self.FIELDS)
+        return record
+
+STATS_CHUNK = 1000           # records per yaml.dump call when streaming stats.yml
+_YAML_DUMPER = getattr(yaml, 'CDumper', yaml.Dumper)  # libyaml when available: same output, much faster
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)  # likewise for safe_load
+
+def _yaml_key(key):
+    """A mapping key line ('key:') as yaml.dump would write it."""
+    line = yaml.dump({key: None}, Dumper=_YAML_DUMPER)
+    return line[:-len(' null\n')] + "\n" if line.endswith(': null\n') and line.count('\n') == 1 else json.dumps(key) + ":\n"
+
 class Stats:
+    # Phases timed per playlist (seconds; summed over workers when they run in parallel):
+    # listing (flat extraction), matching (folder scan + classification), sleep (request pacing
+    # and yt-dlp's sleep_interval*), download (the rest of a download), postprocess (ffmpeg),
+    # move (--stage: copying finished files to the output dir, in the background), save
+    # (playlist state).
+    PHASES = ('listing', 'matching', 'sleep', 'download', 'postprocess', 'move', 'save')
+
     def __init__(self):
         self.stats = {}
+        self.lock = threading.Lock()  # timings arrive from download / postprocessing workers
+
+    def add_time(self, phase, seconds):
+        with self.lock:
+            timing = self.stats.setdefault('timing', {})
+            timing[phase] = round(timing.get(phase, 0) + max(seconds, 0), 3)
+
+    def get_time(self, phase):
+        return self.stats.get('timing', {}).get(phase, 0)
+
+    @contextlib.contextmanager
+    def timer(self, phase):
+        start = time.perf_counter()
+        try: yield
+        finally: self.add_time(phase, time.perf_counter() - start)
+
+    def add_bytes(self, count):
+        with self.lock: self.stats['bytes'] = self.stats.get('bytes', 0) + count
 
     def add_missing(self, missing):
         self._add_key('missing', missing)
@@ -197,14 +643,30 @@ class Stats:
         'failed': 'Failed',
     }
 
-    def calculate_globals(self, pbar, stats_file, console, file_output):
-        categories = [elem for key, elem in self.stats.items() if key != 'global' and isinstance(elem, dict)]
+    def _categories(self):
+        return {key: elem for key, elem in self.stats.items() if key != 'global' and isinstance(elem, dict)}
+
+    def calculate_globals(self, pbar, stats_file, console, file_output, wall=None):
+        categories = list(self._categories().values())
         self.stats['global'] = {}
         for key, label in self.GLOBAL_LABELS.items():
             total = sum(elem[key] for elem in categories if key in elem)
             if total <= 0: continue
             self.stats['global'][key] = total
             if console: pbar.write(f"{label} {total} videos in total")
+        for elem in categories:
+            if elem.get('bytes') and elem.get('timing', {}).get('download'): elem['mb_per_s'] = round(elem['bytes'] / 1e6 / elem['timing']['download'], 2)
+        timing = {phase: round(sum(elem.get('timing', {}).get(phase, 0) for elem in categories), 1) for phase in self.PHASES}
+        timing = {phase: seconds for phase, seconds in timing.items() if seconds > 0}
+        if wall is not None: timing['run'] = round(wall, 1)
+        if timing:
+            self.stats['global']['timing'] = timing
+            if console: pbar.write("Time: " + ", ".join(f"{phase} {_fmt_duration(seconds)}" for phase, seconds in timing.items()))
+        downloaded_bytes = sum(elem.get('bytes', 0) for elem in categories)
+        if downloaded_bytes:
+            self.stats['global']['bytes'] = downloaded_bytes
+            if timing.get('download'): self.stats['global']['mb_per_s'] = round(downloaded_bytes / 1e6 / timing['download'], 2)
+            if console: pbar.write(f"Downloaded {downloaded_bytes / 1e9:.1f} GB" + (f" at {self.stats['global']['mb_per_s']} MB/s" if 'mb_per_s' in self.stats['global'] else ""))
         gb = sum(estimate_gb(elem.get('submitted_file', [])) for elem in categories)
         if gb > 0:
             self.stats['global']['estimated_gb'] = round(gb, 1)
@@ -214,8 +676,53 @@ class Stats:
             self.stats['global']['pending_gb'] = round(gb_pending, 1)
             if console: pbar.write(f"Pending triage: ~{gb_pending:.0f} GB awaiting review (run --triage or --review)")
         if not file_output: return
-        with open(stats_file, 'w') as file:
-            yaml.dump(self.stats, file)
+        self.write(stats_file)
+
+    def write(self, path):
+        """stats.yml: what yaml.dump(self.stats) would write, streamed a playlist and STATS_CHUNK
+        records at a time so neither the whole document nor a dict per record is built."""
+        import textwrap
+        with open(path + '.tmp', 'w') as file:
+            for key in sorted(self.stats):
+                value = self.stats[key]
+                if not isinstance(value, dict) or not value:
+                    file.write(yaml.dump({key: value}, Dumper=_YAML_DUMPER))
+                    continue
+                file.write(_yaml_key(key))
+                for name in sorted(value):
+                    if not (isinstance(value[name], list) and value[name]):
+                        file.write(textwrap.indent(yaml.dump({name: value[name]}, Dumper=_YAML_DUMPER), '  '))
+                        continue
+                    file.write('  ' + _yaml_key(name))
+                    records = value[name]
+                    for start in range(0, len(records), STATS_CHUNK):
+                        chunk = [record.as_dict() if isinstance(record, VideoRecord) else record for record in records[start:start + STATS_CHUNK]]
+                        file.write(textwrap.indent(yaml.dump(chunk, Dumper=_YAML_DUMPER), '  '))
+        os.replace(path + '.tmp', path)
+
+    def export_metrics(self, path, wall):
+        """Write this run's per-playlist timings, bytes and counts for monitoring: a Prometheus
+        textfile (for the node exporter's textfile collector) when path ends in .prom, else
+        one JSON line appended per run."""
+        categories = self._categories()
+        if not path.endswith('.prom'):
+            keys = list(self.GLOBAL_LABELS) + ['timing', 'bytes', 'mb_per_s']
+            record = {'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'run_seconds': round(wall, 1),
+                      'playlists': {name: {key: elem[key] for key in keys if key in elem} for name, elem in categories.items()}}
+            with open(path, 'a') as file: file.write(json.dumps(record) + "\n")
+            return
+        lines = ['# HELP ytdlp_phase_seconds Seconds spent per phase in the last run.', '# TYPE ytdlp_phase_seconds gauge']
+        for name, elem in categories.items():
+            lines += [f'ytdlp_phase_seconds{{playlist="{_prom_label(name)}",phase="{phase}"}} {seconds}' for phase, seconds in elem.get('timing', {}).items()]
+        lines += ['# HELP ytdlp_downloaded_bytes Bytes downloaded in the last run.', '# TYPE ytdlp_downloaded_bytes gauge']
+        lines += [f'ytdlp_downloaded_bytes{{playlist="{_prom_label(name)}"}} {elem.get("bytes", 0)}' for name, elem in categories.items()]
+        lines += ['# HELP ytdlp_videos Videos per status in the last run.', '# TYPE ytdlp_videos gauge']
+        for name, elem in categories.items():
+            lines += [f'ytdlp_videos{{playlist="{_prom_label(name)}",status="{key}"}} {elem[key]}' for key in self.GLOBAL_LABELS if key in elem]
+        lines += ['# HELP ytdlp_run_seconds Wall time of the last run.', '# TYPE ytdlp_run_seconds gauge', f'ytdlp_run_seconds {wall:.1f}',
+                  '# HELP ytdlp_last_run_timestamp_seconds When the last run finished.', '# TYPE ytdlp_last_run_timestamp_seconds gauge', f'ytdlp_last_run_timestamp_seconds {time.time():.0f}']
+        with open(path + '.tmp', 'w') as file: file.write("\n".join(lines) + "\n")
+        os.replace(path + '.tmp', path)  # the collector must never read a half-written file
 
     def add_special_files(self, special_files):
         for file in special_files: self._add_key('special', file)
@@ -233,6 +740,9 @@ class Stats:
     def has_submitted(self):
         return 'submitted' in self.stats
 
+    def get_submitted(self):
+        return self.stats.get('submitted_file', [])
+
     def get_skipped(self):
         if 'skipped' in self.stats: return self.stats['skipped']
         return 0
@@ -267,9 +777,25 @@ class Stats:
                 pbar.write(f"        \"{file['title']}\"")
         if 'failed' in self.stats: pbar.write(f"    Failed {self.stats['failed']} videos")
 
+JOURNAL_COMPACT_ENTRIES = 200  # fold the journal into the YAML snapshot after this many records
+
+def _archive_line(url):
+    """A yt-dlp download_archive line for a video URL."""
+    return "youtube " + url.replace("https://youtube.com/watch?v=", "") + "\n"
+
+def _archive_info(url):
+    """Just enough of an info dict for YoutubeDL.in_download_archive() on a video URL."""
+    return {'id': url.replace("https://youtube.com/watch?v=", ""), 'ie_key': 'Youtube'}
+
 class PlaylistData:
+    # Changes made mid-download are appended to data/<name>.journal (one fsynced JSON line per
+    # video) instead of re-dumping the whole YAML after every video; the journal is replayed
+    # on load, so a crash loses nothing, and folded back into the YAML by save().
+    JOURNALED_OPS = ('add', 'note_listing')
+
     def __init__(self, name):
         self.name = name
+        self.held = set()  # not recorded yet but kept in the archive this run (staged files still moving)
         self._load()
     
     def _load(self):
@@ -277,29 +803,80 @@ class PlaylistData:
         playlist_data_file = os.path.join(DATA_PATH, self.name + '.yml')
         if os.path.exists(playlist_data_file):
             with open(playlist_data_file, 'r') as file:
-                self.playlist_data = yaml.safe_load(file)
+                self.playlist_data = yaml.load(file, Loader=_YAML_LOADER)
+        if 'approved' in self.playlist_data: self.playlist_data['approved'] = dict.fromkeys(self.playlist_data['approved'])  # a list on disk
+        self._replay_journal()
 
     @property
     def archive(self):
         return os.path.join(DATA_PATH, self.name + '.txt')
+
+    @property
+    def journal(self):
+        return os.path.join(DATA_PATH, self.name + '.journal')
     
     @property
     def ignore(self):
         return self.playlist_data['ignore'] if 'ignore' in self.playlist_data else {}
+
+    def _replay_journal(self):
+        self._journal_entries = 0
+        if not os.path.exists(self.journal): return
+        with open(self.journal, 'r') as file:
+            for line in file:
+                try: entry = json.loads(line)
+                except ValueError: break  # torn last line from a crash mid-write; everything before it is good
+                if entry.get('op') not in self.JOURNALED_OPS: continue
+                getattr(self, entry['op'])(*entry.get('args', []))
+                self._journal_entries += 1
+
+    def _append_journal(self, op, *args):
+        with open(self.journal, 'a') as file:
+            file.write(json.dumps({'op': op, 'args': args}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self._journal_entries += 1
+        if self._journal_entries >= JOURNAL_COMPACT_ENTRIES: self.save()
     
     def save(self, archive=True):
+        """Write the YAML snapshot (atomically) and fold in the journal."""
         playlist_data_file = os.path.join(DATA_PATH, self.name + '.yml')
-        with open(playlist_data_file, 'w') as file:
-            yaml.dump(self.playlist_data, file)
-        if not archive: return
-        playlist_data_archive = os.path.join(DATA_PATH, self.name + '.txt')
-        with open(playlist_data_archive, 'w') as file:
-            for url in self.playlist_data['downloaded']:
-                file.write("youtube " + url.replace("https://youtube.com/watch?v=", "") + "\n")
-            if 'ignore' in self.playlist_data:
-                for url in self.playlist_data['ignore']:
-                    file.write("youtube " + url.replace("https://youtube.com/watch?v=", "") + "\n")
+        state = self.playlist_data
+        if 'approved' in state: state = dict(state, approved=list(state['approved']))
+        with open(playlist_data_file + '.tmp', 'w') as file:
+            yaml.dump(state, file, Dumper=_YAML_DUMPER)
+        os.replace(playlist_data_file + '.tmp', playlist_data_file)
+        if os.path.exists(self.journal): os.remove(self.journal)
+        self._journal_entries = 0
+        if archive: self._sync_archive()
+
+    def _sync_archive(self):
+        """Bring the yt-dlp archive in line with downloaded + ignore. yt-dlp appends its own
+        lines as it downloads, so normally only a few are missing: append those, and only
+        rewrite the file when it lists something we no longer track (e.g. an un-ignore)."""
+        wanted = [_archive_line(url) for url in self.playlist_data['downloaded']]
+        if 'ignore' in self.playlist_data:
+            wanted += [_archive_line(url) for url in self.playlist_data['ignore']]
+        wanted += [_archive_line(url) for url in self.held]
+        present = set()
+        if os.path.exists(self.archive):
+            with open(self.archive, 'r') as file:
+                present = set(file)
+        if present - set(wanted):
+            with open(self.archive, 'w') as file:
+                file.writelines(dict.fromkeys(wanted))
+            return
+        missing = [line for line in dict.fromkeys(wanted) if line not in present]
+        if not missing: return
+        with open(self.archive, 'a') as file:
+            file.writelines(missing)
     
+    def hold(self, urls):
+        """Keep these videos in the archive for the rest of the run without recording them, so
+        yt-dlp doesn't fetch them again (their files are still being moved into place)."""
+        self.held.update(urls)
+        self._sync_archive()
+
     @property
     def info(self):
         return self.playlist_data['info']
@@ -308,47 +885,399 @@ class PlaylistData:
     def downloaded(self):
         return self.playlist_data['downloaded']
 
-    def add(self, result):
-        """Add the result to the data file"""
+    def add(self, result, journal=False):
+        """Add the result to the data file (with journal=True, durably right away)"""
         self.playlist_data['downloaded'].add(result['url'])
         self.playlist_data['info'][result['url']] = {
             'title': result['title'],
             'location': result['location'],
             'file': result['file']
         }
+        for key in ('bytes', 'duration'):  # measured size, for the SizeModel
+            if result.get(key): self.playlist_data['info'][result['url']][key] = result[key]
+        if journal: self._append_journal('add', result)
+
+    @property
+    def incremental_runs(self):
+        """Incremental listings since the last full one."""
+        return self.playlist_data.get('incremental_runs', 0)
+
+    @property
+    def listing_size(self):
+        """Videos in the last full listing (None before one): incremental listings are cut
+        short, but OUTTMPL_COUNT's zero-padding must not change with them."""
+        return self.playlist_data.get('listing_size')
+
+    def note_listing(self, full, size=None, journal=False):
+        self.playlist_data['incremental_runs'] = 0 if full else self.incremental_runs + 1
+        if full and size: self.playlist_data['listing_size'] = size
+        if journal: self._append_journal('note_listing', full, size)
+
+    def known(self, url):
+        """Whether a video is already accounted for: downloaded, ignored, pending or approved."""
+        return (url in self.playlist_data['downloaded'] or url in self.ignore
+                or url in self.pending or url in self.approved)
 
     # --- watch / triage support ---
     # pending: new videos in a watched playlist awaiting a decision {url: record}
-    # approved: videos triaged 'download', queued for the next download run [url, ...]
+    # approved: videos triaged 'download', queued for the next download run - an ordered set
+    #           {url: None} in memory (O(1) membership), a list in the YAML
     @property
     def pending(self):
         return self.playlist_data.get('pending', {})
 
     @property
     def approved(self):
-        return self.playlist_data.get('approved', [])
+        return self.playlist_data.get('approved', {})
 
     def add_pending(self, url, record):
         self.playlist_data.setdefault('pending', {})[url] = record
 
+    def decide(self, approve=(), ignore=(), reason='manual triage'):
+        """A batch of triage decisions in one pass: approve moves pending -> approved (download
+        next run), ignore moves pending -> ignore (never offered again). Returns the URLs that
+        weren't ignored before, for append_archive()."""
+        pending = self.playlist_data.get('pending', {})
+        if approve:
+            approved = self.playlist_data.setdefault('approved', {})
+            for url in approve:
+                pending.pop(url, None)
+                approved[url] = None
+        if not ignore: return []
+        ignored, new = self.playlist_data.setdefault('ignore', {}), []
+        for url in ignore:
+            record = pending.pop(url, None) or ignored.get(url)  # already ignored: keep its title
+            if url not in ignored: new.append(url)
+            ignored[url] = {'title': (record or {}).get('title', ''), 'reason': reason}
+        return new
+
     def approve(self, url):
-        """Triage decision 'download': move pending -> approved (download next run)."""
-        self.playlist_data.get('pending', {}).pop(url, None)
-        if url not in self.playlist_data.setdefault('approved', []):
-            self.playlist_data['approved'].append(url)
+        """Triage decision 'download'."""
+        self.decide(approve=[url])
 
     def ignore_video(self, url, reason='manual triage'):
-        """Triage decision 'ignore': move pending -> ignore (never offered again)."""
-        record = self.playlist_data.get('pending', {}).pop(url, None)
-        self.playlist_data.setdefault('ignore', {})[url] = {'title': (record or {}).get('title', ''), 'reason': reason}
+        """Triage decision 'ignore'; returns [url] if it's newly ignored."""
+        return self.decide(ignore=[url], reason=reason)
+
+    def append_archive(self, urls):
+        """Add newly ignored videos to the yt-dlp archive without reading or rewriting it
+        (what save(archive=False) leaves out)."""
+        if not urls: return
+        with open(PlaylistData.archive.fget(self), 'a') as file:
+            file.writelines(_archive_line(url) for url in urls)
 
     def prune_downloaded_approved(self):
         """Drop approved entries that are now downloaded (called after a download run)."""
-        if 'approved' in self.playlist_data:
-            self.playlist_data['approved'] = [u for u in self.playlist_data['approved'] if u not in self.playlist_data['downloaded']]
+        approved = self.playlist_data.get('approved', {})
+        for url in [url for url in approved if url in self.playlist_data['downloaded']]: del approved[url]
+
+STATE_DB = os.path.join(DATA_PATH, 'state.db')
+STATE_BACKEND = 'yaml'       # 'sqlite' (--db): all playlist state in STATE_DB instead of data/<name>.yml
+
+class StateStore:
+    """Single-file SQLite home for every playlist's state. Indexed tables mean one playlist's
+    state - or every playlist's pending queue - is a query, not a parse of every YAML file."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS downloaded (playlist TEXT, url TEXT, title TEXT, location TEXT, file TEXT,
+                                               bytes INTEGER, duration REAL, PRIMARY KEY (playlist, url));
+        CREATE TABLE IF NOT EXISTS ignored (playlist TEXT, url TEXT, title TEXT, reason TEXT,
+                                            PRIMARY KEY (playlist, url));
+        CREATE TABLE IF NOT EXISTS pending (playlist TEXT, url TEXT, record TEXT, PRIMARY KEY (playlist, url));
+        CREATE TABLE IF NOT EXISTS approved (playlist TEXT, url TEXT, seq INTEGER, PRIMARY KEY (playlist, url));
+        CREATE TABLE IF NOT EXISTS meta (playlist TEXT, key TEXT, value TEXT, PRIMARY KEY (playlist, key));
+        CREATE INDEX IF NOT EXISTS downloaded_url ON downloaded (url);
+    """
+
+    def __init__(self, path=STATE_DB):
+        # One connection shared by every thread, serialized by our own lock.
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        with self.lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.executescript(self.SCHEMA)
+            columns = [row[1] for row in self.conn.execute('PRAGMA table_info(downloaded)')]
+            if 'bytes' not in columns:  # store from before measured sizes were kept
+                self.conn.execute('ALTER TABLE downloaded ADD COLUMN bytes INTEGER')
+                self.conn.execute('ALTER TABLE downloaded ADD COLUMN duration REAL')
+
+    def execute(self, sql, params=()):
+        with self.lock: return self.conn.execute(sql, params).fetchall()
+
+    def executemany(self, sql, rows):
+        with self.lock: self.conn.executemany(sql, rows)
+
+    def commit(self):
+        with self.lock: self.conn.commit()
+
+    def pending(self, names):
+        """(playlist, url, record) pending triage across the given playlists, one playlist at a time."""
+        for name in names:
+            for url, record in self.execute('SELECT url, record FROM pending WHERE playlist = ?', (name,)):
+                yield name, url, json.loads(record)
+
+    def export_archive(self, name, path, extra=()):
+        """Write the yt-dlp download_archive text file for a playlist (downloaded + ignored,
+        plus the extra urls)."""
+        urls = self.execute('SELECT url FROM downloaded WHERE playlist = ? UNION SELECT url FROM ignored WHERE playlist = ?', (name, name))
+        with open(path + '.tmp', 'w') as file:
+            file.writelines(dict.fromkeys([_archive_line(url) for url, in urls] + [_archive_line(url) for url in extra]))
+        os.replace(path + '.tmp', path)
+
+    def import_playlist(self, data):
+        """Replace a playlist's rows with the contents of a (YAML-backed) PlaylistData."""
+        name, state = data.name, data.playlist_data
+        with self.lock:
+            for table in ('downloaded', 'ignored', 'pending', 'approved', 'meta'):
+                self.conn.execute(f'DELETE FROM {table} WHERE playlist = ?', (name,))
+            self.conn.executemany('INSERT INTO downloaded VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(name, url, info.get('title'), info.get('location'), info.get('file'), info.get('bytes'), info.get('duration')) for url, info in
+                 ((url, state['info'].get(url, {})) for url in state['downloaded'])])
+            self.conn.executemany('INSERT INTO ignored VALUES (?, ?, ?, ?)',
+                [(name, url, (rec or {}).get('title'), (rec or {}).get('reason')) for url, rec in state.get('ignore', {}).items()])
+            self.conn.executemany('INSERT INTO pending VALUES (?, ?, ?)',
+                [(name, url, json.dumps(rec, default=str)) for url, rec in state.get('pending', {}).items()])
+            self.conn.executemany('INSERT INTO approved VALUES (?, ?, ?)',
+                [(name, url, seq) for seq, url in enumerate(state.get('approved', []))])
+            self.conn.execute('INSERT INTO meta VALUES (?, ?, ?)', (name, 'incremental_runs', str(state.get('incremental_runs', 0))))
+            if state.get('listing_size'): self.conn.execute('INSERT INTO meta VALUES (?, ?, ?)', (name, 'listing_size', str(state['listing_size'])))
+            self.conn.commit()
+
+_state_store = None
+
+def state_store():
+    global _state_store
+    if _state_store is None:
+        with _singletons_lock:
+            if _state_store is None: _state_store = StateStore()
+    return _state_store
+
+class SqlitePlaylistData(PlaylistData):
+    """PlaylistData on the StateStore: same API and in-memory shape, but every change is
+    written through to the database, so save() is a commit instead of a file rewrite."""
+    def _load(self):
+        self.db = state_store()
+        self._journal_entries = 0
+        rows = self.db.execute('SELECT url, title, location, file, bytes, duration FROM downloaded WHERE playlist = ?', (self.name,))
+        self.playlist_data = {'downloaded': {url for url, *_ in rows}, 'info': {}}
+        for url, title, location, file, size, duration in rows:
+            info = self.playlist_data['info'][url] = {'title': title, 'location': location, 'file': file}
+            if size: info['bytes'] = size
+            if duration: info['duration'] = duration
+        ignore = self.db.execute('SELECT url, title, reason FROM ignored WHERE playlist = ?', (self.name,))
+        if ignore: self.playlist_data['ignore'] = {url: {'title': title, 'reason': reason} for url, title, reason in ignore}
+        pending = self.db.execute('SELECT url, record FROM pending WHERE playlist = ?', (self.name,))
+        if pending: self.playlist_data['pending'] = {url: json.loads(record) for url, record in pending}
+        approved = self.db.execute('SELECT url FROM approved WHERE playlist = ? ORDER BY seq', (self.name,))
+        if approved: self.playlist_data['approved'] = dict.fromkeys(url for url, in approved)
+        for key, value in self.db.execute('SELECT key, value FROM meta WHERE playlist = ?', (self.name,)):
+            if key in ('incremental_runs', 'listing_size'): self.playlist_data[key] = int(value)
+
+    @property
+    def archive(self):
+        """yt-dlp only reads a text archive, so export it from the database on the way out."""
+        path = PlaylistData.archive.fget(self)
+        self.db.export_archive(self.name, path, extra=self.held)
+        return path
+
+    def save(self, archive=True):
+        self.db.commit()
+
+    def add(self, result, journal=False):
+        super().add(result)
+        self.db.execute('INSERT OR REPLACE INTO downloaded VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (self.name, result['url'], result['title'], result['location'], result['file'], result.get('bytes'), result.get('duration')))
+        if journal: self.db.commit()
+
+    def note_listing(self, full, size=None, journal=False):
+        super().note_listing(full, size)
+        self.db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?, ?)', (self.name, 'incremental_runs', str(self.incremental_runs)))
+        if self.listing_size: self.db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?, ?)', (self.name, 'listing_size', str(self.listing_size)))
+        if journal: self.db.commit()
+
+    def add_pending(self, url, record):
+        super().add_pending(url, record)
+        self.db.execute('INSERT OR REPLACE INTO pending VALUES (?, ?, ?)', (self.name, url, json.dumps(record, default=str)))
+
+    def decide(self, approve=(), ignore=(), reason='manual triage'):
+        approve, ignore = list(approve), list(ignore)
+        new = super().decide(approve, ignore, reason)
+        self.db.executemany('DELETE FROM pending WHERE playlist = ? AND url = ?', [(self.name, url) for url in approve + ignore])
+        if approve:
+            seq = self.db.execute('SELECT COALESCE(MAX(seq), -1) + 1 FROM approved WHERE playlist = ?', (self.name,))[0][0]
+            self.db.executemany('INSERT OR IGNORE INTO approved VALUES (?, ?, ?)', [(self.name, url, seq + i) for i, url in enumerate(approve)])
+        self.db.executemany('INSERT OR REPLACE INTO ignored VALUES (?, ?, ?, ?)',
+                            [(self.name, url, self.playlist_data['ignore'][url]['title'], reason) for url in ignore])
+        return new
+
+    def prune_downloaded_approved(self):
+        super().prune_downloaded_approved()
+        self.db.execute('DELETE FROM approved WHERE playlist = ? AND url IN (SELECT url FROM downloaded WHERE playlist = ?)',
+                        (self.name, self.name))
+
+def open_playlist(name):
+    """The PlaylistData for a playlist, on whichever state backend is active."""
+    return SqlitePlaylistData(name) if STATE_BACKEND == 'sqlite' else PlaylistData(name)
+
+def import_state(data_file, console=True):
+    """One-shot migration: copy every playlist's YAML state (journal included) into STATE_DB."""
+    with open(data_file) as f:
+        data = yaml.safe_load(f)
+    store = state_store()
+    for item in data:
+        store.import_playlist(PlaylistData(item['name']))
+    if console: print(f"Imported {len(data)} playlist(s) into {STATE_DB}")
+
+def export_archives(data_file, console=True):
+    """Write every playlist's yt-dlp archive (data/<name>.txt) from STATE_DB."""
+    with open(data_file) as f:
+        data = yaml.safe_load(f)
+    store = state_store()
+    for item in data:
+        store.export_archive(item['name'], os.path.join(DATA_PATH, item['name'] + '.txt'))
+    if console: print(f"Exported {len(data)} archive(s) from {STATE_DB}")
+
+MEDIA_DEDUP = True            # reuse a video another playlist already has on disk (--no-dedup)
+FICLONE = 0x40049409         # Linux ioctl: copy-on-write clone of a whole file (btrfs, xfs, ...)
+
+def _location(item):
+    """A data.yml item's folder, relative to the download path."""
+    return os.path.join(item['location'], item['name']) if 'location' in item else item['name']
+
+def _media_kind(item):
+    """Which format a playlist downloads: files are only reused between playlists of one kind."""
+    return 'audio' if item.get('mp3') else 'video'
+
+def _link_media(source, target):
+    """Put an existing media file at target without downloading it again: a hardlink, else a
+    reflink where the filesystem supports one, else a plain copy. Returns the method used."""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+        return 'hardlink'
+    except OSError: pass  # other filesystem, or no hardlinks (FAT / SMB)
+    try:
+        import fcntl
+        with open(source, 'rb') as src, open(target, 'wb') as dst: fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return 'reflink'
+    except (ImportError, OSError):
+        if os.path.exists(target): os.remove(target)
+    shutil.copy2(source, target)
+    return 'copy'
+
+class MediaIndex:
+    """Video URL -> the files already on disk for it, across every playlist in the data file.
+    Each playlist keeps its own archive, so without this a video listed in three playlists is
+    downloaded and postprocessed three times. Keyed by format kind too (an audio playlist never
+    reuses a video file). Videos downloaded during the run are added as they finish. The
+    playlists it loads are kept in `playlists` for the ItemDownloaders to take over."""
+    def __init__(self, data, path):
+        self.path = os.path.expanduser(path)
+        self.files = {}
+        self.lock = threading.Lock()
+        self.playlists = {}
+        for item in data:
+            kind = _media_kind(item)
+            self.playlists[item['name']] = open_playlist(item['name'])
+            for url, info in self.playlists[item['name']].info.items(): self.add(url, kind, info)
+
+    def add(self, url, kind, record):
+        with self.lock:
+            self.files.setdefault((url, kind), []).append((os.path.join(self.path, record['location'], record['file']), record['title']))
+
+    def find(self, url, kind):
+        """(filename, title) of a file on disk for this video in this format, or None."""
+        with self.lock: candidates = list(self.files.get((url, kind), ()))
+        for filename, title in candidates:
+            if os.path.isfile(filename): return filename, title
+        return None
+
+QUEUE_FILE = os.path.join(DATA_PATH, 'queue.jsonl')
+QUEUE_MAX_RETRIES = 3        # runs in a row a video may fail before it's no longer queued
+
+class WorkQueue:
+    """The download run's to-do list, persisted so a killed run picks up where it stopped.
+    After the stats pass every playlist's targets (submitted videos, approved ones for watch
+    playlists) are queued; each video then moves queued -> downloading -> (postprocessing ->)
+    done, or failed. Every transition is one fsynced JSON line in QUEUE_FILE - the last line
+    for a video wins on replay - and save() compacts it down to what isn't done. A run that
+    finds queued videos (an interrupted or budgeted run) downloads them first, ahead of what
+    its own stats pass adds, and TMP_DIR (yt-dlp's .part files and fragments) is kept until
+    they're through so they resume mid-file. Failed videos are just queued again
+    by the next stats pass, until they've failed QUEUE_MAX_RETRIES runs in a row."""
+
+    def __init__(self, path=QUEUE_FILE, persist=True):
+        self.path, self.persist = path, persist
+        self.entries = {}  # (playlist, url) -> {'playlist', 'url', 'extra_info', 'state', 'retries'}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                for line in file:
+                    try: entry = json.loads(line)
+                    except ValueError: break  # torn last line from a crash mid-write
+                    self.entries[(entry['playlist'], entry['url'])] = entry
+            for entry in self.entries.values():
+                if entry['state'] in ('downloading', 'postprocessing'): entry['state'] = 'queued'  # interrupted
+            self.save()
+
+    def _append(self, entries):
+        if not self.persist or not entries: return
+        with open(self.path, 'a') as file:
+            file.writelines(json.dumps(entry) + "\n" for entry in entries)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def enqueue(self, playlist, targets):
+        """Queue a playlist's [(url, extra_info)] targets, replacing what it had queued; returns
+        the targets to download (those that haven't failed QUEUE_MAX_RETRIES times)."""
+        with self.lock:
+            retries = {url: entry['retries'] for (name, url), entry in self.entries.items() if name == playlist}
+            for key in [key for key in self.entries if key[0] == playlist]: del self.entries[key]
+            entries = [{'playlist': playlist, 'url': url, 'extra_info': extra_info, 'state': 'queued', 'retries': retries.get(url, 0)} for url, extra_info in targets]
+            for entry in entries:
+                if entry['retries'] >= QUEUE_MAX_RETRIES: entry['state'] = 'failed'  # given up: kept, not retried
+                self.entries[(playlist, entry['url'])] = entry
+            self._append(entries)
+            return [(entry['url'], entry['extra_info']) for entry in entries if entry['state'] == 'queued']
+
+    def mark(self, playlist, url, state):
+        with self.lock:
+            entry = self.entries.get((playlist, url))
+            if entry is None or entry['state'] == state: return
+            entry['state'] = state
+            if state == 'failed': entry['retries'] += 1
+            self._append([entry])
+
+    def settle(self, playlist, url, interrupted=False, archived=False):
+        """After yt-dlp returns for a video: still 'downloading' means it never finished - it
+        failed, was cut short by a stopping run (queued again to resume), or yt-dlp skipped it
+        as already in the archive (done)."""
+        with self.lock: entry = self.entries.get((playlist, url))
+        if entry and entry['state'] == 'downloading': self.mark(playlist, url, 'done' if archived else 'queued' if interrupted else 'failed')
+
+    def pending(self, playlist):
+        """[(url, extra_info)] a playlist still has to download."""
+        with self.lock:
+            return [(entry['url'], entry['extra_info']) for (name, url), entry in self.entries.items() if name == playlist and entry['state'] == 'queued']
+
+    def playlists(self):
+        """Playlists with queued videos."""
+        with self.lock: return set(name for (name, url), entry in self.entries.items() if entry['state'] == 'queued')
+
+    def save(self):
+        """Compact the journal to what isn't done (removed when that's nothing)."""
+        with self.lock:
+            entries = [entry for entry in self.entries.values() if entry['state'] != 'done']
+            self.entries = {(entry['playlist'], entry['url']): entry for entry in entries}
+            if not self.persist: return
+            if not entries:
+                if os.path.exists(self.path): os.remove(self.path)
+                return
+            with open(self.path + '.tmp', 'w') as file: file.writelines(json.dumps(entry) + "\n" for entry in entries)
+            os.replace(self.path + '.tmp', self.path)
 
 class ItemDownloader:
-    def __init__(self, item, pbar, path):
+    def __init__(self, item, pbar, path, limiter=None, playlist_data=None):
+        _heavy_imports()
         self.opts = BASE_OPTIONS.copy()
         self.name = item['name']
         if 'channel' in item and item['channel']: item['url'] = item['url'] + '/videos'
@@ -356,21 +1285,36 @@ class ItemDownloader:
         self.item = item
         self.watch = bool(item.get('watch'))  # watched playlists collect new videos for triage instead of auto-downloading
         self.pbar = pbar
-        self.playlist_data = PlaylistData(self.name)
-        self.location = os.path.join(item['location'], item['name']) if 'location' in item else item['name']
+        self.playlist_data = playlist_data or open_playlist(self.name)
+        self.location = _location(item)
         self.outputdir = os.path.join(path, self.location)
         self.tempdir = TMP_DIR
-        self._set_formatting(item, pbar)
         self.stats = Stats()
+        self._set_formatting(item, pbar)
+        self.limiter = limiter
+        self.checked, self.not_found = False, False
+        self.listing_size = None
+        self.lock = threading.RLock()  # guards stats / playlist_data when downloads run on worker threads
+        self.pipeline = None  # PostprocessPipeline, set by downloader() for --postprocess-workers
+        self.media = None  # MediaIndex, set by downloader() unless --no-dedup
+        self.kind = _media_kind(item)
+        self.stagingdir = os.path.join(os.path.expanduser(TMP_DIR), 'staging', self.location)
+        self.current = None  # file being downloaded right now (--daemon status)
+        self.queue = None  # WorkQueue, set by downloader() on download runs
+        self.queued = None  # targets resumed from the WorkQueue, downloaded ahead of this run's own
+        self.mover = None  # StagedMover, set by downloader() for --stage
+        self.outgoingdir = os.path.join(STAGE_DIR, self.location)
     
     def finalize(self, update=False, console=True, file_output=True, list_info=False):
         self.stats.output(self.pbar, console=console, list_info=list_info)
+        if self.watch: self.playlist_data.prune_downloaded_approved()  # drop what's been downloaded
         # Watch playlists must persist their pending/approved changes even on a plain -s run.
-        if file_output and (update or self.watch): self.playlist_data.save()
+        if file_output and (update or self.watch):
+            with self.stats.timer('save'): self.playlist_data.save()
         return self.stats
 
     def _set_formatting(self, item, pbar):
-        self.opts['logger'] = TQDMLogger(pbar)
+        self.opts['logger'] = TQDMLogger(pbar, self.stats)
         if 'mp3' in item and item['mp3']: 
             self.opts['format'] = FORMAT_AUDIO
             self.opts.update(AUDIO_OPTIONS)
@@ -387,40 +1331,113 @@ class ItemDownloader:
         self.opts['outtmpl'] = outtmpl + OUTTMPL_DEFAULT
 
     def _check_special_files(self):
-        self.existing_files = []
-        if os.path.exists(self.outputdir):
-            self.existing_files = [name for name in os.listdir(self.outputdir) if os.path.isfile(os.path.join(self.outputdir, name)) and (name.endswith('.mp4') or name.endswith(".m4a"))]
-            if os.name == 'posix': self.existing_files = [unicodedata.normalize('NFC', name) for name in self.existing_files]
-            filesnames = [elem['file'] for elem in self.playlist_data.info.values()]
-            if os.name == 'posix': filesnames = [unicodedata.normalize('NFC', name) for name in filesnames]
-            filesnames = [ntpath.basename(name) for name in filesnames]
+        self.existing_files = FilenameIndex([])
+        files = directory_cache().files(self.outputdir)
+        self.all_files = set(files or ())
+        if files is not None:
+            self.existing_files = FilenameIndex(name for name in files if name.endswith('.mp4') or name.endswith(".m4a"))
+            filesnames = {ntpath.basename(_nfc(elem['file'])) for elem in self.playlist_data.info.values()}
             self.stats.add_special_files([file for file in self.existing_files if file not in filesnames])
         for url in self.playlist_data.ignore:
             self.stats.add_ignored(self.playlist_data.ignore[url])
 
-    def _download_video(self, wait=True, file_output=True, console=True):
-        """Download the video"""
+    def _download_options(self, wait=True):
         download_opts = self.opts.copy()
         download_opts.update(DOWNLOAD_OPTIONS_BASE)
-        if wait: download_opts.update(DOWNLOAD_OPTIONS_WAIT)
+        if wait: download_opts.update(throttle().options())
         download_opts['download_archive'] = self.playlist_data.archive
-        # Watch playlists download the curated list of approved video URLs; track playlists
-        # hand yt-dlp the whole playlist URL and let the archive skip what's already done.
-        targets = list(self.playlist_data.approved) if self.watch else [self.url]
+        if self.pipeline:
+            # Only the pre-download steps run inline; the file lands in the staging dir and
+            # the PostprocessPipeline does the ffmpeg work and the move to outputdir.
+            download_opts['postprocessors'] = [pp for pp in self.opts['postprocessors'] if pp.get('when', 'post_process') != 'post_process']
+            download_opts['paths'] = {'home': self.stagingdir + '/', 'temp': self.tempdir + '/'}
+        elif self.mover: download_opts['paths'] = {'home': self.outgoingdir + '/', 'temp': self.tempdir + '/'}
+        return download_opts
+
+    @property
+    def finaldir(self):
+        """Where a finished (postprocessed) file goes: the output dir, or STAGE_DIR with --stage."""
+        return self.outgoingdir if self.mover else self.outputdir
+
+    def _postprocess_options(self):
+        """Options for a PostprocessPipeline worker process: just the post_process steps."""
+        opts = {key: value for key, value in self.opts.items() if key != 'logger'}  # the logger can't cross processes
+        opts['postprocessors'] = [pp for pp in self.opts['postprocessors'] if pp.get('when', 'post_process') == 'post_process']
+        return opts
+
+    def _downloaded(self, info_dict, filename, file_output=True):
+        """A download finished: record it, or hand it to the postprocessing pipeline first."""
+        throttle().success()
+        if self.pipeline:
+            if self.queue: self.queue.mark(self.name, info_dict['webpage_url'].replace("https://www.", "https://"), 'postprocessing')
+            self.pipeline.submit(self, info_dict, filename, file_output=file_output)
+        else: self._finished(info_dict, filename, file_output)
+
+    def _finished(self, info_dict, filename, file_output=True):
+        """A file is complete: record it, or with --stage hand it to the mover first."""
+        if self.mover: self.mover.submit(self, info_dict, filename, file_output)
+        else: self._record_download(info_dict, filename, file_output)
+
+    def _record_download(self, info_dict, filename, file_output=True):
+        """Bookkeeping for a finished (and postprocessed) video."""
+        result = {
+            'url': info_dict['webpage_url'].replace("https://www.", "https://"),
+            'title': info_dict['title'],
+            'location': self.location,
+            'file': ntpath.basename(filename),
+        }
+        if info_dict.get('duration') and os.path.exists(filename):  # a real download, not a link to another playlist's file
+            result['bytes'], result['duration'] = os.path.getsize(filename), info_dict['duration']
+            size_model().observe(self.name, info_dict.get('channel'), self.kind, result['bytes'], result['duration'])
+        self.stats.add_downloaded(result)
+        self.playlist_data.add(result, journal=file_output)
+        if self.media: self.media.add(result['url'], self.kind, result)
+        if self.queue: self.queue.mark(self.name, result['url'], 'done')
+
+    def _link_duplicates(self, targets, file_output=True, console=True):
+        """Satisfy the targets another playlist already has on disk (MediaIndex) with a local
+        link instead of a download, recorded like any other download. Returns the targets that
+        still need yt-dlp. The name comes from this playlist's own template when the listing
+        gave us its fields, else the other playlist's file name is kept."""
+        if not self.media: return targets
+        records = {record['url']: record for record in self.stats.get_submitted()} if self.checked else {}
+        remaining, linked, ydl = [], 0, None
+        outputdir = os.path.expanduser(self.outputdir)
+        for url, extra_info in targets:
+            found = self.media.find(url, self.kind)
+            if not found:
+                remaining.append((url, extra_info))
+                continue
+            source, title = found
+            if url in records:
+                if ydl is None: ydl = YoutubeDL(self.opts)  # only for prepare_filename: no network
+                record = records[url]
+                filename = ydl.prepare_filename(dict(extra_info or {}, id=url.rsplit('=', 1)[-1], title=record['title'], uploader=record.get('channel'), ext=os.path.splitext(source)[1][1:]))
+                title = record['title']
+            else: filename = os.path.join(outputdir, os.path.basename(source))
+            if os.path.abspath(filename) == os.path.abspath(source):
+                remaining.append((url, extra_info))
+                continue
+            if not os.path.exists(filename): _link_media(source, filename)
+            with self.lock: self._record_download({'webpage_url': url, 'title': title}, filename, file_output)
+            linked += 1
+        if ydl is not None: ydl.close()
+        if linked and console: self.pbar.write(f"    Reused {linked} videos already downloaded for other playlists")
+        return remaining
+
+    def _download_video(self, wait=True, file_output=True, console=True):
+        """Download the video"""
+        download_opts = self._download_options(wait)
+        targets = self._queue_targets(file_output, console)
         if not targets: return
         info_dict = {}
+        download_opts['logger'] = logger = TQDMLogger(self.pbar, self.stats)  # its own, to count this download's sleeps
+        start, postprocessing = time.perf_counter(), {'started': 0.0, 'seconds': 0.0}
         with YoutubeDL(download_opts) as ydl:
-            if self.watch:
-                count = len(targets)
-            else:
-                info = ydl.sanitize_info(ydl.extract_info(self.url, download=False))
-                count = info['playlist_count']
-            if console: self.pbar.write(f"Downloading {self.name} with {count} videos...")
-            pbar_playlist = trange(count, leave=False, desc=self.name, ascii=True, miniters=1)
+            count = len(targets) if self.checked or self.watch else None  # a bare playlist URL: unknown until yt-dlp lists it
+            if console: self.pbar.write(f"Downloading {self.name} with {count if count is not None else 'all new'} videos...")
+            pbar_playlist = tqdm(total=count, leave=False, desc=self.name, ascii=True, miniters=1)
             pbar_video = trange(100, leave=False, desc='Starting', ascii=True)
-            if not self.watch:
-                pbar_playlist.update(self.stats.get_skipped())
-                pbar_playlist.update(self.stats.get_ignored())
             pbar_playlist.refresh()
             def tqdm_hook(d):
                 nonlocal info_dict
@@ -429,67 +1446,143 @@ class ItemDownloader:
                 nonlocal console
                 if d['status'] == 'downloading':
                     pbar_video.set_description(f"Downloading {os.path.basename(d['filename'])}")
+                    self.current = os.path.basename(d['filename'])
                     if 'total_bytes' not in d: curr_prog = d['fragment_index'] / d['fragment_count']
                     elif d['total_bytes'] is None: curr_prog = 0
                     else: curr_prog = d['downloaded_bytes'] / d['total_bytes']
                     pbar_video.update(int(curr_prog*100) - pbar_video.n)
                 elif d['status'] == 'error':
                     if console: self.pbar.write(f"    Error: {os.path.basename(d['filename'])} with error {d['error']}")
-                    self.stats.add_failed({})
+                    with self.lock: self.stats.add_failed({})
                     pbar_playlist.update(1)
                 elif d['status'] == 'finished':
                     pbar_video.set_description(f"Finished {os.path.basename(d['filename'])}")
+                    self.stats.add_bytes(d.get('downloaded_bytes') or d.get('total_bytes') or 0)
                     info_dict = d['info_dict']
             def tqdm_hook_post(d):
                 nonlocal pbar_video
                 nonlocal info_dict
                 if d['status'] == 'started':
                     pbar_video.set_description(f"Postprocessing {d['postprocessor']} for {d['info_dict']['title']}")
+                    postprocessing['started'] = time.perf_counter()
                 elif d['status'] == 'finished':
                     pbar_video.set_description(f"Finished {d['postprocessor']} for {d['info_dict']['title']}")
+                    postprocessing['seconds'] += time.perf_counter() - postprocessing['started']
                     info_dict = d['info_dict']
             def post_hook(filename):
                 pbar_video.set_description(f"Finished {info_dict['title']}")
                 nonlocal pbar_playlist
                 nonlocal file_output
-                result = {
-                    'url': info_dict['webpage_url'].replace("https://www.", "https://"),
-                    'title': info_dict['title'],
-                    'location': self.location,
-                    'file': ntpath.basename(filename),
-                }
-                self.stats.add_downloaded(result)
+                self._downloaded(info_dict, filename, file_output)
+                throttle().apply(ydl.params)  # a whole-playlist target is one extract_info: re-pace between its videos
                 pbar_playlist.update(1)
-                self.playlist_data.add(result)
-                if file_output: self.playlist_data.save(archive=False)
             ydl.add_progress_hook(tqdm_hook)
             ydl.add_postprocessor_hook(tqdm_hook_post)
             ydl.add_post_hook(post_hook)
-            ydl.download(targets)
+            for url, extra_info in targets:
+                throttle().apply(ydl.params)
+                if self.queue: self.queue.mark(self.name, url, 'downloading')
+                interrupted = False
+                try: ydl.extract_info(url, extra_info=extra_info)
+                except (KeyboardInterrupt, DownloadCancelled):
+                    interrupted = True  # Ctrl-C: queued again for the next run, not a failure
+                    raise
+                finally:
+                    if self.queue: self.queue.settle(self.name, url, interrupted=interrupted, archived=ydl.in_download_archive(_archive_info(url)))
         pbar_video.close()
         pbar_playlist.close()
-        if self.watch: self.playlist_data.prune_downloaded_approved()  # drop what just downloaded
+        self.stats.add_time('postprocess', postprocessing['seconds'])
+        self.stats.add_time('download', time.perf_counter() - start - logger.slept - postprocessing['seconds'])
 
-    def _check_stats(self, url, title, channel, item, console=True, update=False, nas=False, duration=0):
-        safe_chars = {'/': '', ':': '', '*': '', '"': '_', '<': '', '>': '', '|': '', '?': ''}
-        existing_file = next((f for f in self.existing_files if safe_filename(title.translate(str.maketrans(safe_chars))) in f), None)
-        if not existing_file:
-            existing_file = next((f for f in self.existing_files if sanitize_filename(title) in f), None)
+    def _download_one(self, url, extra_info, opts, limiter, file_output=True, console=True, stopping=None):
+        """Download one target on a DownloadScheduler worker: its own YoutubeDL from this
+        playlist's options, the scheduler's shared pacing, and locked bookkeeping. Once the
+        stopping event is set the download is cut short at its next progress update."""
+        info_dict = {}
+        logger = TQDMLogger(self.pbar, self.stats)
+        start, postprocessing = time.perf_counter(), {'started': 0.0, 'seconds': 0.0}
+        with PacedYoutubeDL(dict(opts, logger=logger), limiter=limiter) as ydl:
+            def progress_hook(d):
+                nonlocal info_dict
+                if stopping and stopping.is_set(): raise DownloadCancelled('run stopping')
+                if d['status'] == 'downloading': self.current = os.path.basename(d['filename'])
+                elif d['status'] == 'error':
+                    if console: self.pbar.write(f"    Error: {os.path.basename(d['filename'])} with error {d['error']}")
+                    with self.lock: self.stats.add_failed({})
+                elif d['status'] == 'finished':
+                    self.stats.add_bytes(d.get('downloaded_bytes') or d.get('total_bytes') or 0)
+                    info_dict = d['info_dict']
+            def postprocessor_hook(d):
+                nonlocal info_dict
+                if d['status'] == 'started': postprocessing['started'] = time.perf_counter()
+                elif d['status'] == 'finished':
+                    postprocessing['seconds'] += time.perf_counter() - postprocessing['started']
+                    info_dict = d['info_dict']
+            def post_hook(filename):
+                with self.lock: self._downloaded(info_dict, filename, file_output)
+            ydl.add_progress_hook(progress_hook)
+            ydl.add_postprocessor_hook(postprocessor_hook)
+            ydl.add_post_hook(post_hook)
+            throttle().apply(ydl.params)
+            if self.queue: self.queue.mark(self.name, url, 'downloading')
+            try: ydl.extract_info(url, extra_info=extra_info)
+            finally:
+                if self.queue: self.queue.settle(self.name, url, interrupted=bool(stopping and stopping.is_set()), archived=ydl.in_download_archive(_archive_info(url)))
+                self.stats.add_time('sleep', ydl.paced)
+                self.stats.add_time('postprocess', postprocessing['seconds'])
+                self.stats.add_time('download', time.perf_counter() - start - ydl.paced - logger.slept - postprocessing['seconds'])
+
+    def _queue_targets(self, file_output=True, console=True, link=True):
+        """This run's download targets: duplicates linked from other playlists (unless link is
+        False: a budgeted run links only what it admits), the rest put on the WorkQueue (a
+        bare playlist URL isn't a video, so it can't be queued)."""
+        targets = self._download_targets()
+        if link: targets = self._link_duplicates(targets, file_output, console)
+        if self.queue and self.checked:
+            queued = self.queue.enqueue(self.name, targets)
+            if console and len(queued) < len(targets): self.pbar.write(f"    Skipping {len(targets) - len(queued)} videos that failed {QUEUE_MAX_RETRIES} runs in a row (see {QUEUE_FILE})")
+            targets = queued
+        return targets
+
+    def resume(self, targets, console=True):
+        """Download these targets left queued by an earlier run (interrupted, or over its
+        budget) first, ahead of whatever this run's stats pass finds. A hard kill can leave
+        one in the archive though it was never recorded (yt-dlp archives it as soon as the
+        PostprocessPipeline has it): drop those lines, or yt-dlp would skip it as done while
+        its staged file is lost with TMP_DIR. Its download is found still staged and only
+        postprocessed again."""
+        self.queued = targets
+        if targets: self.playlist_data._sync_archive()
+        if console and targets: self.pbar.write(f"Resuming {len(targets)} queued videos of {self.name}")
+
+    def _download_targets(self):
+        """[(url, extra_info)] to hand yt-dlp. Watch playlists download the curated list of
+        approved videos. After a stats pass, track playlists download exactly the submitted
+        videos from the listing we already hold - re-resolving the playlist would page through
+        it all over again - with the archive still skipping anything done in the meantime;
+        playlist_index (and its zero-padding) is carried over so OUTTMPL_COUNT names don't
+        change. Without a stats pass yt-dlp gets the playlist URL and the archive does the rest.
+        Targets resumed from the WorkQueue go first."""
+        if self.watch: targets = [(url, None) for url in self.playlist_data.approved]
+        elif not self.checked: targets = [(self.url, None)]
+        else: targets = [(record['url'], {'playlist_index': record['playlist_index'], '__last_playlist_index': self.listing_size})
+                         for record in self.stats.get_submitted()]
+        if not self.queued: return targets
+        resumed = {url for url, extra_info in self.queued}
+        return self.queued + [(url, extra_info) for url, extra_info in targets if url not in resumed]
+
+    def _check_stats(self, url, title, channel, item, console=True, update=False, nas=False, duration=0, index=None):
+        existing_file = self.existing_files.match(title)
         url = url.replace("https://www.", "https://")
         in_playlist = url in self.playlist_data.downloaded
-        record = item.copy()
-        record['url'] = url
-        record['title'] = title
-        record.pop('channel', None)
-        record['channel'] = channel
-        record['duration'] = duration
+        record = VideoRecord(item, url, title, channel, duration, index)
         if 'ignore' in self.playlist_data.playlist_data and url in self.playlist_data.playlist_data['ignore']:
             return
         if not existing_file and not in_playlist:
             if url in self.playlist_data.approved:
                 pass  # already triaged for download; will be fetched on the next download run
             elif self.watch:
-                self.playlist_data.add_pending(url, record)  # collect for triage instead of downloading
+                self.playlist_data.add_pending(url, record.as_dict())  # collect for triage instead of downloading
                 self.stats.add_pending(record)
             else:
                 self.stats.add_submitted(record)
@@ -507,12 +1600,10 @@ class ItemDownloader:
             if os.name == 'posix' and not nas: 
                 self.stats.add_skipped(record)
                 return
-            stored_file = self.playlist_data.info[url]['file']
-            if os.name == 'posix': stored_file = unicodedata.normalize('NFC', stored_file)
-            filesnames = [elem for elem in self.existing_files]
-            if os.name == 'posix': filesnames = [unicodedata.normalize('NFC', name) for name in filesnames]
-            filename = os.path.join(self.outputdir, stored_file)
-            if not os.path.exists(filename) and stored_file not in filesnames:
+            stored_file = _nfc(self.playlist_data.info[url]['file'])
+            if stored_file in self.all_files: present = True  # from the directory snapshot: no stat
+            else: present = ntpath.basename(stored_file) != stored_file and os.path.exists(os.path.join(os.path.expanduser(self.outputdir), stored_file))
+            if not present:
                 self.stats.add_missing(record)
             else: self.stats.add_skipped(record)
         if existing_file and in_playlist: self.stats.add_skipped(record)
@@ -535,124 +1626,224 @@ class ItemDownloader:
                 time.sleep(STATS_FETCH_RETRY_WAIT)
         return info, entries, playlist_count
 
-    def progress(self, download=False, stat_checker=False, update=False, wait=True, console=True, nas=False, file_output=True):
-        if stat_checker:
-            stat_opts = self.opts.copy()
-            stat_opts.update(STATS_OPTIONS)
-            self._check_special_files()
-            with YoutubeDL(stat_opts) as ydl:
+    def _extract_new_entries(self, ydl):
+        """Only the newest part of a newest-first listing: entries are read lazily, page by
+        page, until INCREMENTAL_STOP_AFTER videos in a row turn out to be known already. For a
+        big channel with nothing new that is one page instead of the whole catalogue."""
+        info = ydl.extract_info(self.url, download=False, process=False)
+        if info is None: return None, []
+        entries, streak = [], 0
+        for entry in info.get('entries') or []:
+            entries.append(entry)
+            url = (entry or {}).get('url') or ''
+            streak = streak + 1 if self.playlist_data.known(url.replace("https://www.", "https://")) else 0
+            if streak >= INCREMENTAL_STOP_AFTER: break
+        return info, entries
+
+    def _incremental(self, full_listing):
+        """Whether this run may use an incremental listing: newest-first sources only, never
+        on --full-listing, and every INCREMENTAL_FULL_EVERY-th run is full regardless."""
+        if full_listing or not (self.item.get('channel') or self.item.get('newest_first')): return False
+        return self.playlist_data.incremental_runs + 1 < INCREMENTAL_FULL_EVERY
+
+    def _list(self, incremental, wait=True, listings=None, file_output=True):
+        """(info, entries, playlist_count, age) of the playlist: a fresh copy from the
+        ListingCache (age in seconds), else listed by yt-dlp (age None) and cached (unless -f)."""
+        cached = listings.get(self.url, incremental) if listings else None
+        if cached: return {'playlist_count': cached[1]}, cached[0], cached[1], cached[2]
+        if listings and listings.offline: return None, [], None, None  # --replay: nothing recorded for it
+        stat_opts = self.opts.copy()
+        stat_opts.update(STATS_OPTIONS)
+        with PacedYoutubeDL(stat_opts, limiter=self.limiter) as ydl:
+            start = time.perf_counter()
+            if incremental:
+                (info, entries), playlist_count = self._extract_new_entries(ydl), None
+            else:
                 info, entries, playlist_count = self._extract_entries(ydl, wait)
-                if info is None:
-                    if console: self.pbar.write(f"Error: {self.name} not found")
-                    return
-                pbar_playlist = trange(playlist_count or len(entries), leave=False, desc=self.name, ascii=True, miniters=1)
-                if console: self.pbar.write(f"Checking stats of {self.name} with {playlist_count} videos")
-                for entry in entries:
-                    if entry and entry.get('url') and entry.get('title'):
-                        self._check_stats(entry['url'], entry['title'], entry.get('channel'), self.item, console=console, update=update, nas=nas, duration=entry.get('duration') or 0)
-                    else:
-                        self.stats.add_skipped(entry)
-                    pbar_playlist.update(1)
-                    pbar_playlist.refresh()
-                # Deletion detection only when the listing is complete. A truncated listing
-                # (YouTube stops paginating) would flag every un-listed video as deleted, so
-                # we skip it then rather than false-flag - or hang trying to verify hundreds.
-                urls = set(entry['url'].replace("https://www.", "https://") for entry in entries if entry and entry.get('url'))
-                complete = playlist_count is not None and len(entries) >= playlist_count
-                if complete:
-                    for key in self.playlist_data.info.keys():
-                        if key not in urls:
-                            self.stats.add_deleted(os.path.splitext(self.playlist_data.info[key]['file'])[0])
-                # else: listing truncated by YouTube - skip deletion detection silently
-                # (reporting it would false-flag every un-listed video as deleted).
-                pbar_playlist.close()
-            # Watch playlists download only what's been approved in triage; track playlists
-            # download whatever's newly submitted.
-            if self.watch:
-                if not self.playlist_data.approved: return
-            elif not self.stats.has_submitted():
-                return
-        if download: self._download_video(wait=wait, file_output=file_output, console=console)
-
-REVIEW_FILE = 'review.yml'
+            self.stats.add_time('sleep', ydl.paced)
+            self.stats.add_time('listing', time.perf_counter() - start - ydl.paced)
+        if listings and file_output and info is not None: listings.put(self.url, entries, playlist_count, incremental)
+        return info, entries, playlist_count, None
+
+    def check_stats(self, update=False, wait=True, console=True, nas=False, file_output=True, full_listing=False, listings=None):
+        """The stats pass: list the playlist and classify every entry against what we have."""
+        with self.stats.timer('matching'): self._check_special_files()
+        incremental = self._incremental(full_listing)
+        info, entries, playlist_count, age = self._list(incremental, wait, listings, file_output)
+        self.checked = True
+        if info is None:
+            self.not_found = True
+            if console: self.pbar.write(f"Error: {self.name} not found" + (" in the recorded listings" if listings and listings.offline else ""))
+            return
+        if file_output and age is None: self.playlist_data.note_listing(full=not incremental, size=playlist_count, journal=True)
+        pbar_playlist = trange(playlist_count or len(entries), leave=False, desc=self.name, ascii=True, miniters=1)
+        cached = f"listing cached {_fmt_duration(age)} ago" if age is not None else None
+        if console and incremental: self.pbar.write(f"Checking new videos of {self.name} ({len(entries)} listed, incremental" + (f", {cached})" if cached else ")"))
+        elif console: self.pbar.write(f"Checking stats of {self.name} with {playlist_count} videos" + (f" ({cached})" if cached else ""))
+        self.listing_size = playlist_count or max(self.playlist_data.listing_size or 0, len(entries))  # cut short: the last full size
+        start = time.perf_counter()
+        for index, entry in enumerate(entries, 1):
+            if entry and entry.get('url') and entry.get('title'):
+                self._check_stats(entry['url'], entry['title'], entry.get('channel'), self.item, console=console, update=update, nas=nas, duration=entry.get('duration') or 0, index=index)
+            else:
+                self.stats.add_skipped(entry)
+            pbar_playlist.update(1)
+            pbar_playlist.refresh()
+        # Deletion detection only when the listing is complete. A truncated listing
+        # (YouTube stops paginating) would flag every un-listed video as deleted, so
+        # we skip it then rather than false-flag - or hang trying to verify hundreds.
+        urls = set(entry['url'].replace("https://www.", "https://") for entry in entries if entry and entry.get('url'))
+        complete = playlist_count is not None and len(entries) >= playlist_count
+        if complete:
+            for key in self.playlist_data.info.keys():
+                if key not in urls:
+                    self.stats.add_deleted(os.path.splitext(self.playlist_data.info[key]['file'])[0])
+        # else: listing truncated by YouTube - skip deletion detection silently
+        # (reporting it would false-flag every un-listed video as deleted).
+        pbar_playlist.close()
+        self.stats.add_time('matching', time.perf_counter() - start)
+
+    def has_work(self):
+        """Whether a download run has anything to do. Without a stats pass we can't tell, so
+        assume yes; after one, watch playlists download only what's been approved in triage
+        and track playlists whatever's newly submitted."""
+        if self.queued or not self.checked: return True
+        if self.not_found: return False
+        if self.watch: return bool(self.playlist_data.approved)
+        return self.stats.has_submitted()
+
+    def progress(self, download=False, stat_checker=False, update=False, wait=True, console=True, nas=False, file_output=True, full_listing=False, listings=None):
+        if stat_checker: self.check_stats(update=update, wait=wait, console=console, nas=nas, file_output=file_output, full_listing=full_listing, listings=listings)
+        if download and self.has_work(): self._download_video(wait=wait, file_output=file_output, console=console)
+
+REVIEW_FILE = 'review.yml'     # before paging; still applied if one is lying around
+REVIEW_PAGE = 'review-{:03d}.yml'
+REVIEW_PAGE_SIZE = 500         # videos per review-NNN.yml
+TRIAGE_PAGE_SIZE = 50          # videos taken off the heap at a time by --triage
 
 def _fmt_duration(seconds):
     seconds = int(seconds or 0)
     h, m, s = seconds // 3600, (seconds % 3600) // 60, seconds % 60
     return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
 
+class _Playlists(dict):
+    """name -> PlaylistData, opened on first use."""
+    def __missing__(self, name):
+        self[name] = open_playlist(name)
+        return self[name]
+
+class PendingHeap:
+    """Every watched playlist's pending videos, largest first, without sorting them all:
+    heapify is one O(n) pass and each page of k costs O(k log n), so the first triage prompt
+    or review page is ready after a single scan of the queue. Only what a prompt / review
+    row shows is kept per video, not its whole record."""
+    def __init__(self, items):
+        self.heap = [(-estimate_gb([record]), seq, name, url, record.get('title', ''), record.get('duration'))
+                     for seq, (name, url, record) in enumerate(items)]
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def page(self, size):
+        """The next (up to) size largest: [(name, url, title, duration, gb)]."""
+        page = []
+        while self.heap and len(page) < size:
+            gb, seq, name, url, title, duration = heapq.heappop(self.heap)
+            page.append((name, url, title, duration, -gb))
+        return page
+
 def _gather_pending(data_file):
-    """Load every watched playlist's pending videos. Returns (playlists, items) where
-    playlists maps name->PlaylistData and items is [(name, url, record)] sorted largest-first."""
+    """A PendingHeap of every watched playlist's pending videos. Playlists are read one at
+    a time and not kept: triage and apply_review open only the ones they change."""
     with open(data_file) as f:
         data = yaml.safe_load(f)
-    playlists, items = {}, []
-    for item in data:
-        if not item.get('watch'): continue
-        pd = PlaylistData(item['name'])
-        playlists[item['name']] = pd
-        for url, record in pd.pending.items():
-            items.append((item['name'], url, record))
-    items.sort(key=lambda t: estimate_gb([t[2]]), reverse=True)
-    return playlists, items
-
-def triage(data_file, file_output=True):
+    names = [item['name'] for item in data if item.get('watch')]
+    if STATE_BACKEND == 'sqlite': return PendingHeap(state_store().pending(names))  # straight from the index
+    return PendingHeap((name, url, record) for name in names for url, record in open_playlist(name).pending.items())
+
+def triage(data_file, file_output=True, top=None):
     """Interactively triage pending videos (largest first): download / ignore / skip / quit."""
-    playlists, items = _gather_pending(data_file)
-    if not items:
+    heap = _gather_pending(data_file)
+    if not heap:
         print("Nothing pending triage.")
         return
-    print(f"{len(items)} videos pending triage, largest first.  [d]ownload  [i]gnore  [s]kip  [q]uit\n")
-    changed = set()
-    for i, (name, url, record) in enumerate(items):
-        print(f"[{i+1}/{len(items)}] {name}")
-        print(f"    {record.get('title', '?')}")
-        print(f"    {_fmt_duration(record.get('duration'))}   ~{estimate_gb([record]):.1f} GB   {url}")
-        choice = ''
-        while choice not in ('d', 'i', 's', 'q', ''):
-            choice = input("    [d/i/s/q] > ").strip().lower()
-        if choice == 'q': break
-        if choice == 'd': playlists[name].approve(url); changed.add(name)
-        elif choice == 'i': playlists[name].ignore_video(url); changed.add(name)
-        # 's' or empty -> skip: stays pending, offered again next time
+    total = min(len(heap), top or len(heap))
+    print(f"{total} videos pending triage, largest first.  [d]ownload  [i]gnore  [s]kip  [q]uit\n")
+    playlists, ignored, shown, stop = _Playlists(), {}, 0, False
+    while shown < total and not stop:
+        for name, url, title, duration, gb in heap.page(min(TRIAGE_PAGE_SIZE, total - shown)):
+            shown += 1
+            print(f"[{shown}/{total}] {name}")
+            print(f"    {title or '?'}")
+            print(f"    {_fmt_duration(duration)}   ~{gb:.1f} GB   {url}")
+            choice = ''
+            while choice not in ('d', 'i', 's', 'q', ''):
+                choice = input("    [d/i/s/q] > ").strip().lower()
+            if choice == 'q':
+                stop = True
+                break
+            if choice == 'd': playlists[name].approve(url)
+            elif choice == 'i': ignored.setdefault(name, []).extend(playlists[name].ignore_video(url))
+            # 's' or empty -> skip: stays pending, offered again next time
     if file_output:
-        for name in changed: playlists[name].save()
-    print(f"\nUpdated {len(changed)} playlist(s).")
-
-def write_review(data_file):
-    """Write pending videos to review.yml for batch editing (applied on the next run)."""
-    playlists, items = _gather_pending(data_file)
-    if not items:
+        for name, pd in playlists.items():  # opened = decided on
+            pd.save(archive=False)
+            pd.append_archive(ignored.get(name))
+    print(f"\nUpdated {len(playlists)} playlist(s).")
+
+def _review_pages():
+    """The review files waiting to be applied, in order."""
+    pages = sorted((name for name in os.listdir('.') if re.fullmatch(r'review-\d{3,}\.yml', name)), key=lambda name: int(name[7:-4]))
+    return ([REVIEW_FILE] if os.path.exists(REVIEW_FILE) else []) + pages
+
+def write_review(data_file, top=None):
+    """Write pending videos to review-001.yml, review-002.yml, ... (REVIEW_PAGE_SIZE each,
+    largest first) for batch editing, applied on the next run. Edits to the previous set
+    are applied first, so regenerating never throws decisions away."""
+    apply_review(data_file)
+    heap = _gather_pending(data_file)
+    if not heap:
         print("Nothing pending triage.")
         return
-    rows = [{'action': 'pending', 'playlist': name,
-             'title': record.get('title', ''), 'duration': _fmt_duration(record.get('duration')),
-             'est_gb': round(estimate_gb([record]), 2), 'url': url}
-            for name, url, record in items]
-    header = ("# Triage queue, largest first. Set 'action' to one of:\n"
+    total = min(len(heap), top or len(heap))
+    header = ("# Triage queue, page {} of {}, largest first. Set 'action' to one of:\n"
               "#   download | ignore | skip   (leave as 'pending' to decide later)\n"
               "# Saved decisions are applied automatically the next time you run the script.\n")
-    with open(REVIEW_FILE, 'w') as f:
-        f.write(header)
-        yaml.dump(rows, f, sort_keys=False, allow_unicode=True)
-    print(f"Wrote {REVIEW_FILE} with {len(rows)} videos. Edit the 'action' fields; applied on your next run.")
+    pages = (total + REVIEW_PAGE_SIZE - 1) // REVIEW_PAGE_SIZE
+    for number in range(1, pages + 1):
+        rows = [{'action': 'pending', 'playlist': name, 'title': title, 'duration': _fmt_duration(duration),
+                 'est_gb': round(gb, 2), 'url': url}
+                for name, url, title, duration, gb in heap.page(min(REVIEW_PAGE_SIZE, total - (number - 1) * REVIEW_PAGE_SIZE))]
+        with open(REVIEW_PAGE.format(number), 'w') as f:
+            f.write(header.format(number, pages))
+            yaml.dump(rows, f, sort_keys=False, allow_unicode=True, Dumper=_YAML_DUMPER)
+    print(f"Wrote {total} videos to {REVIEW_PAGE.format(1)}" + (f" .. {REVIEW_PAGE.format(pages)}" if pages > 1 else "")
+          + ". Edit the 'action' fields; applied on your next run.")
 
 def apply_review(data_file, console=True):
-    """Consume review.yml: apply download/ignore decisions, then delete the file."""
-    if not os.path.exists(REVIEW_FILE): return
-    with open(REVIEW_FILE) as f:
-        rows = yaml.safe_load(f) or []
-    playlists, applied = {}, 0
-    for row in rows:
-        action = str(row.get('action', 'pending')).strip().lower()
-        name, url = row.get('playlist'), row.get('url')
-        if action not in ('download', 'ignore') or not name or not url: continue
-        pd = playlists.get(name) or playlists.setdefault(name, PlaylistData(name))
-        (pd.approve if action == 'download' else pd.ignore_video)(url)
-        applied += 1
-    for pd in playlists.values(): pd.save()
-    os.remove(REVIEW_FILE)
-    if console and applied: print(f"Applied {applied} triage decision(s) from {REVIEW_FILE}")
+    """Consume the review files one at a time: apply a page's download / ignore decisions,
+    save just the playlists it touched, then delete it - an interrupted apply leaves only
+    the pages it hadn't finished, and re-applying a decision is harmless."""
+    applied, touched = 0, set()
+    for page in _review_pages():
+        with open(page) as f:
+            rows = yaml.load(f, Loader=_YAML_LOADER) or []
+        decisions = {}  # playlist -> ([approved urls], [ignored urls])
+        for row in rows:
+            action = str(row.get('action', 'pending')).strip().lower()
+            name, url = row.get('playlist'), row.get('url')
+            if action not in ('download', 'ignore') or not name or not url: continue
+            decisions.setdefault(name, ([], []))[action == 'ignore'].append(url)
+            applied += 1
+        for name, (approve, ignore) in decisions.items():
+            pd = open_playlist(name)
+            new = pd.decide(approve, ignore)
+            pd.save(archive=False)  # the archive only gains the newly ignored videos
+            pd.append_archive(new)
+        touched.update(decisions)
+        os.remove(page)
+    if console and applied: print(f"Applied {applied} triage decision(s) to {len(touched)} playlist(s) from the review files")
 
 def _warn_if_stale_ytdlp(console):
     """Warn when yt-dlp looks old. Anti-bot evasion is a moving target measured in weeks, so
@@ -668,26 +1859,454 @@ def _warn_if_stale_ytdlp(console):
               "changes constantly; update before you get walled:")
         print('         python3 -m pip install -U --pre "yt-dlp[default]"   (nightly channel)')
 
-def downloader(data_file, path, download, check_stats, update, wait, stats_file, console, file_output, list_info, nas):
+def _prefetch_stats(data, pbar, path, jobs, wait=True, playlists=None, **kwargs):
+    """Run the stats pass for up to `jobs` playlists at once, yielding each ItemDownloader in
+    data-file order (so stats merge deterministically, and downloads can start as soon as the
+    first playlist is checked). All listings share one RateLimiter, so the combined request
+    rate stays at one per STATS_REQUEST_INTERVAL (at the learned pace) however many run at once."""
+    limiter = RateLimiter(0)
+    if wait: throttle().track(limiter, STATS_REQUEST_INTERVAL)
+    def check(item):
+        item_downloader = ItemDownloader(item, pbar, path, limiter=limiter, playlist_data=(playlists or {}).get(item['name']))
+        item_downloader.check_stats(wait=wait, **kwargs)
+        return item_downloader
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        futures = [pool.submit(check, item) for item in data]
+        for future in futures: yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+DOWNLOAD_JOBS = 1            # videos downloaded at once (--download-jobs)
+
+class DownloadScheduler:
+    """Dispatches individual video downloads from every playlist onto one pool of workers
+    (--download-jobs). The pool size is the global concurrency ceiling; all workers share one
+    HostRateLimiter, so the combined request rate to YouTube stays at the single-process
+    pace of DOWNLOAD_OPTIONS_WAIT['sleep_interval_requests'] (scaled by the AdaptiveThrottle)
+    however many run at once."""
+    def __init__(self, jobs, pbar, wait=True, file_output=True, console=True, budget=None):
+        self.pool = ThreadPoolExecutor(max_workers=jobs)
+        self.budget = budget
+        self.options = {}  # playlist name -> its download options
+        self.limiter = HostRateLimiter(0)
+        if wait: throttle().track(self.limiter, DOWNLOAD_OPTIONS_WAIT['sleep_interval_requests'])
+        self.pbar = pbar
+        self.wait, self.file_output, self.console = wait, file_output, console
+        self.futures = []
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()  # set by close(): running downloads stop, their .part files stay
+        self.abandoned = False  # close() was interrupted: downloads may still be writing to TMP_DIR
+        self.progress = tqdm(total=0, desc='Videos', leave=False, ascii=True)
+
+    def submit(self, item_downloader, targets=None):
+        """Queue every download target of an (already checked) playlist, or just these."""
+        if targets is None:
+            if not item_downloader.has_work(): return []
+            targets = item_downloader._queue_targets(self.file_output, self.console)
+            if targets and self.console: self.pbar.write(f"Queued {len(targets)} videos of {item_downloader.name}")
+        if not targets: return []
+        opts = self.options.get(item_downloader.name)
+        if opts is None:
+            opts = self.options[item_downloader.name] = item_downloader._download_options(self.wait)  # once per playlist: the archive is shared by its workers
+            opts.pop('sleep_interval_requests', None)  # replaced by the global per-host pacing
+        with self.lock:
+            self.progress.total += len(targets)
+            self.progress.refresh()
+        futures = [self.pool.submit(self._run, item_downloader, url, extra_info, opts) for url, extra_info in targets]
+        self.futures.append((item_downloader, futures))
+        return futures
+
+    def submit_planned(self, item_downloaders):
+        """Budgeted run: gather the targets of every checked playlist, let the DownloadBudget
+        pick and order them, and queue the admitted ones in that order. Duplicates are only
+        linked from other playlists once admitted, as a link may well be a copy."""
+        candidates = []
+        for item_downloader in item_downloaders:
+            if not item_downloader.has_work(): continue
+            records = {record['url']: record for record in item_downloader.stats.get_submitted()}
+            candidates += [(item_downloader, url, extra_info, records.get(url)) for url, extra_info in item_downloader._queue_targets(self.file_output, self.console, link=False)]
+        admitted = self.budget.plan(candidates)
+        if self.console: self.pbar.write(self.budget.summary(len(admitted), len(candidates)))
+        by_playlist = {}
+        for item_downloader, url, extra_info, record in admitted: by_playlist.setdefault(item_downloader, []).append((url, extra_info))
+        remaining = set()
+        for item_downloader, targets in by_playlist.items():
+            remaining.update((item_downloader, url) for url, extra_info in item_downloader._link_duplicates(targets, self.file_output, self.console))
+        for item_downloader, url, extra_info, record in admitted:
+            if (item_downloader, url) in remaining: self.submit(item_downloader, [(url, extra_info)])
+
+    def _run(self, item_downloader, url, extra_info, opts):
+        if self.stopping.is_set(): return
+        if self.budget and not self.budget.allow(item_downloader.name, url):
+            with self.lock: self.progress.update(1)
+            if self.budget.report() and self.console: self.pbar.write(f"Budget: {self.budget.stopped}, not starting any more downloads; the rest stay in {QUEUE_FILE} for the next run")
+            return
+        try:
+            item_downloader._download_one(url, extra_info, opts, self.limiter, file_output=self.file_output, console=self.console, stopping=self.stopping)
+        except DownloadCancelled: pass  # queued again by settle(): the next run resumes it
+        finally:
+            if self.budget: self.budget.finish(item_downloader.name, url)
+            with self.lock: self.progress.update(1)
+
+    def join(self):
+        """Wait for every queued download."""
+        for item_downloader, futures in self.futures:
+            for future in futures: future.result()
+        self.close()
+
+    def close(self):
+        """Drop whatever hasn't started, stop the running downloads and wait for the workers
+        to let go, so TMP_DIR isn't cleaned up under them. What didn't finish stays queued."""
+        self.stopping.set()
+        try: self.pool.shutdown(wait=True, cancel_futures=True)
+        except KeyboardInterrupt:  # a download still in its pre-download sleep: don't wait it out
+            self.abandoned = True
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        self.progress.close()
+
+DISK_RESERVE_GB = 20         # free space a budgeted run leaves on the target disk: ffmpeg's merge needs ~2x a video
+BUDGET_ORDERS = ('weight', 'smallest', 'oldest')  # --order
+
+def _parse_clock(value):
+    """--until HH:MM as an epoch: the next time the local clock reads HH:MM."""
+    match = re.fullmatch(r'\s*(\d{1,2}):(\d{2})\s*', value)
+    if not match: raise ValueError(f"invalid time {value!r} (use HH:MM)")
+    now = time.localtime()
+    deadline = time.mktime(now[:3] + (int(match.group(1)), int(match.group(2)), 0) + now[6:])
+    return deadline if deadline > time.time() else deadline + 86400
+
+class DownloadBudget:
+    """Admission control for a download run (--max-gb, --until/--max-time, --order,
+    --reserve-gb). After every stats pass, the videos to fetch are sized with estimate_gb,
+    ordered (by the playlists' 'weight:', smallest-first or oldest-first) and admitted while
+    they fit the free space of the target disk less DISK_RESERVE_GB and the per-run cap.
+    Before each download starts the disk is checked again and the time window too, so a run
+    stops between videos rather than failing mid-ffmpeg on a full disk. Whatever isn't
+    admitted or started stays on the WorkQueue for the next run."""
+    def __init__(self, path, max_gb=None, deadline=None, order='weight', reserve_gb=DISK_RESERVE_GB):
+        self.path, self.max_gb, self.deadline, self.order, self.reserve_gb = path, max_gb, deadline, order, reserve_gb
+        self.estimates = {}  # (playlist name, url) -> estimated GB of an admitted video
+        self.running = {}    # (playlist name, url) -> estimated GB of a download in progress
+        self.planned_gb = self.budget_gb = self.free = 0.0
+        self.stopped = None  # why downloads stopped starting
+        self.reported = False
+        self.lock = threading.Lock()
+
+    def free_gb(self):
+        path = os.path.expanduser(self.path)
+        while not os.path.exists(path) and os.path.dirname(path) != path: path = os.path.dirname(path)
+        return shutil.disk_usage(path).free / 1e9
+
+    def _keys(self, candidates):
+        """Sort key per candidate. Flat listings carry no upload dates, so the listing gives the
+        age: index 1 is the newest video of a channel / newest-first playlist and the oldest
+        of any other. 'oldest' ranks each video by how many in its playlist are older, so the
+        oldest of every playlist go first whatever its weight (no index: first)."""
+        keys = []
+        for position, (item_downloader, url, extra_info, record) in enumerate(candidates):
+            item = item_downloader.item
+            weight = -float(item.get('weight', 1))
+            index = (record or {}).get('playlist_index') or 0
+            if index and (item.get('channel') or item.get('newest_first')):
+                index = max((item_downloader.listing_size or index) - index + 1, 1)
+            if self.order == 'smallest': keys.append((estimate_gb([record]) if record else 0.0, weight, position))
+            elif self.order == 'oldest': keys.append((index, position))
+            else: keys.append((weight, position))
+        return keys
+
+    def plan(self, candidates):
+        """[(item_downloader, url, extra_info, record)] -> the admitted ones, in download order.
+        A video that doesn't fit is skipped and smaller ones after it still get a chance;
+        videos without a record (approved watch videos, resumed ones) count as 0 GB here and
+        rely on the check before they start. Without a stats pass nothing would be sized, so
+        --max-gb / --order need -s."""
+        keys = self._keys(candidates)
+        ordered = [candidate for _, candidate in sorted(zip(keys, candidates), key=lambda pair: pair[0])]
+        self.free = self.free_gb()
+        self.budget_gb = self.free - self.reserve_gb
+        if self.max_gb is not None: self.budget_gb = min(self.budget_gb, self.max_gb)
+        admitted = []
+        for item_downloader, url, extra_info, record in ordered:
+            gb = estimate_gb([record]) if record else 0.0
+            if self.planned_gb + gb > self.budget_gb: continue
+            self.planned_gb += gb
+            self.estimates[(item_downloader.name, url)] = gb
+            admitted.append((item_downloader, url, extra_info, record))
+        return admitted
+
+    def summary(self, admitted, candidates):
+        line = f"Budget: {admitted} of {candidates} videos admitted, ~{self.planned_gb:.1f} of {max(self.budget_gb, 0):.1f} GB ({self.free:.1f} GB free, {self.reserve_gb} GB kept)"
+        if self.deadline: line += f", starting downloads until {time.strftime('%H:%M', time.localtime(self.deadline))}"
+        return line
+
+    def allow(self, name, url):
+        """Last check before a video starts: the time window, and the disk as it is now less
+        the whole estimate of every download still running (--download-jobs)."""
+        with self.lock:
+            if self.stopped: return False
+            gb = self.estimates.get((name, url), 0.0)
+            if self.deadline and time.time() >= self.deadline: self.stopped = 'time window over'
+            elif self.free_gb() - self.reserve_gb - sum(self.running.values()) < gb: self.stopped = 'target disk nearly full'
+            else: self.running[(name, url)] = gb
+            return not self.stopped
+
+    def finish(self, name, url):
+        """A download allowed by allow() is over; its file now shows in the free space."""
+        with self.lock: self.running.pop((name, url), None)
+
+    def report(self):
+        """Whether the stop still needs reporting (once per run)."""
+        with self.lock:
+            first, self.reported = not self.reported, True
+            return first
+
+POSTPROCESS_WORKERS = 0      # ffmpeg worker processes (--postprocess-workers); 0 = inline, as before
+
+def _has_cover(ydl, path):
+    """Whether ffprobe finds an attached picture (embedded thumbnail) in a media file."""
+    from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessor
+    streams = FFmpegPostProcessor(ydl).get_metadata_object(path).get('streams', [])
+    return any(stream.get('disposition', {}).get('attached_pic') for stream in streams)
+
+def _postprocess_worker(opts, info, outputdir, sidecars):
+    """In a PostprocessPipeline process: run the post_process steps on a staged download and
+    move it, and whatever sidecars the steps didn't consume, into the output dir. Returns the
+    final path, the seconds it took and whether a thumbnail that should have been embedded
+    is missing from it."""
+    start = time.perf_counter()
+    _heavy_imports()  # a fresh (spawned) interpreter
+    info['__finaldir'] = outputdir
+    with YoutubeDL(opts) as ydl:
+        filepath = ydl.post_process(info['filepath'], info, files_to_move=dict.fromkeys(sidecars))['filepath']
+        embeds = any(pp['key'] == 'EmbedThumbnail' for pp in opts['postprocessors'])
+        thumbnail = any(t.get('filepath') for t in info.get('thumbnails') or ())
+        no_cover = embeds and thumbnail and filepath.endswith(('.mp4', '.m4a')) and not _has_cover(ydl, filepath)
+    return filepath, time.perf_counter() - start, no_cover
+
+class PostprocessPipeline:
+    """Overlaps ffmpeg with the network (--postprocess-workers N). Downloads land in a staging
+    dir under TMP_DIR with only their pre-process steps done; the metadata / thumbnail /
+    subtitle embedding and the move into the output dir run on a process pool while the next
+    download starts, so a run takes max(network, CPU) instead of their sum. A video is only
+    recorded as downloaded once its postprocessing has finished."""
+    def __init__(self, workers, pbar, console=True):
+        from concurrent.futures import ProcessPoolExecutor  # only needed here; slow to import
+        import multiprocessing
+        # spawn, not fork: the download side may already be running threads
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self.pbar, self.console = pbar, console
+        self.outstanding = 0
+        self.idle = threading.Condition()
+        self.abandoned = False  # close() was interrupted: staged downloads left in TMP_DIR
+
+    def submit(self, item_downloader, info_dict, filename, file_output=True):
+        # Only JSON-able, public fields cross the process boundary (yt-dlp's private
+        # '__postprocessors' etc. hold live objects).
+        info = {key: value for key, value in YoutubeDL.sanitize_info(dict(info_dict)).items() if not key.startswith('__')}
+        info['filepath'] = filename
+        # The inline pass already moved the thumbnail and subtitle files next to the download
+        # (yt-dlp always runs MoveFiles), but their 'filepath's still name the temp dir.
+        sidecars = []
+        for entry in (info.get('thumbnails') or []) + list((info.get('requested_subtitles') or {}).values()):
+            if not entry.get('filepath'): continue
+            entry['filepath'] = os.path.join(os.path.dirname(filename), os.path.basename(entry['filepath']))
+            if os.path.exists(entry['filepath']): sidecars.append(entry['filepath'])
+        with self.idle: self.outstanding += 1
+        future = self.pool.submit(_postprocess_worker, item_downloader._postprocess_options(), info, item_downloader.finaldir, sidecars)
+        future.add_done_callback(lambda f: self._done(f, item_downloader, info, file_output))
+
+    def _done(self, future, item_downloader, info, file_output):
+        try:
+            if future.cancelled(): return  # abandoned by close(): still staged in TMP_DIR
+            filename, seconds, no_cover = future.result()
+            item_downloader.stats.add_time('postprocess', seconds)
+            if no_cover and self.console: self.pbar.write(f"    No cover art embedded in {os.path.basename(filename)}")
+            with item_downloader.lock: item_downloader._finished(info, filename, file_output)
+        except Exception as e:
+            if self.console: self.pbar.write(f"    Postprocessing failed for {info.get('title')}: {e}")
+            with item_downloader.lock: item_downloader.stats.add_failed({})
+            if item_downloader.queue: item_downloader.queue.mark(item_downloader.name, info['webpage_url'].replace("https://www.", "https://"), 'failed')
+        finally:
+            with self.idle:
+                self.outstanding -= 1
+                self.idle.notify_all()
+
+    def join(self):
+        """Wait until every handed-off video is postprocessed and recorded."""
+        with self.idle:
+            while self.outstanding: self.idle.wait()
+        self.close()
+
+    def close(self):
+        """Finish whatever was handed off: those videos are downloaded and already in the
+        archive, so dropping them would lose them. A second Ctrl-C abandons the rest."""
+        with self.idle: outstanding = self.outstanding
+        if outstanding and self.console: self.pbar.write(f"Finishing postprocessing of {outstanding} videos (Ctrl-C again to abandon them)")
+        try: self.pool.shutdown(wait=True)
+        except KeyboardInterrupt:
+            self.abandoned = True
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+MOVE_CHUNK = 8 * 1024 * 1024  # bytes per read / write while copying to the output dir
+MOVE_RETRIES = 3             # copy attempts per file before it's left in STAGE_DIR for the next run
+MOVE_SIDECAR = '.move.json'  # next to a staged file: what to record once it has arrived
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while chunk := file.read(MOVE_CHUNK): digest.update(chunk)
+    return digest.hexdigest()
+
+class StagedMover:
+    """--stage: downloads and ffmpeg work stay on the local disk (STAGE_DIR), and finished
+    files are copied to the output dir (the NAS) by one background thread while the next
+    video downloads. Each copy goes to a hidden partial name, is read back and checked
+    against the source's SHA-256, then renamed into place, so the output dir never holds a
+    half-copied video. The video is only recorded in PlaylistData once it has arrived. A
+    sidecar (MOVE_SIDECAR) next to every staged file says what to record, so files left by a
+    crash or a failed copy are moved by the next run (recover())."""
+    def __init__(self, pbar, console=True):
+        self.pool = ThreadPoolExecutor(max_workers=1)  # one stream to the NAS at a time
+        self.pbar, self.console = pbar, console
+        self.outstanding = 0
+        self.idle = threading.Condition()
+
+    def submit(self, item_downloader, info_dict, filename, file_output=True):
+        info = {key: info_dict.get(key) for key in ('webpage_url', 'title', 'duration', 'channel')}
+        with open(filename + MOVE_SIDECAR, 'w') as file: json.dump(info, file)
+        if item_downloader.queue: item_downloader.queue.mark(item_downloader.name, info['webpage_url'].replace("https://www.", "https://"), 'moving')
+        self._start(item_downloader, info, filename, file_output)
+
+    def recover(self, item_downloader, file_output=True):
+        """Move whatever an earlier run left staged for this playlist."""
+        directory = os.path.expanduser(item_downloader.outgoingdir)
+        if not os.path.isdir(directory): return
+        sidecars = [name for name in sorted(os.listdir(directory)) if name.endswith(MOVE_SIDECAR)]
+        staged = []
+        for name in sidecars:
+            with open(os.path.join(directory, name), 'r') as file: staged.append((json.load(file), os.path.join(directory, name[:-len(MOVE_SIDECAR)])))
+        # Saving the playlist dropped them from the archive (they weren't recorded yet): hold
+        # them there so yt-dlp doesn't fetch them again while they're moving.
+        if staged: item_downloader.playlist_data.hold(info['webpage_url'].replace("https://www.", "https://") for info, filename in staged)
+        for info, filename in staged: self._start(item_downloader, info, filename, file_output)
+        if sidecars and self.console: self.pbar.write(f"Moving {len(sidecars)} videos of {item_downloader.name} left in {STAGE_DIR}")
+
+    def _start(self, item_downloader, info, filename, file_output):
+        with self.idle: self.outstanding += 1
+        future = self.pool.submit(self._move, filename, item_downloader.outputdir)
+        future.add_done_callback(lambda f: self._done(f, item_downloader, info, filename, file_output))
+
+    @staticmethod
+    def _move(source, outputdir):
+        """Copy source into outputdir, verify and rename it into place; returns the final path
+        and the seconds it took."""
+        start = time.perf_counter()
+        outputdir = os.path.expanduser(outputdir)
+        target = os.path.join(outputdir, os.path.basename(source))
+        if not os.path.exists(source) and os.path.exists(target): return target, 0.0  # arrived before a crash, not yet recorded
+        os.makedirs(outputdir, exist_ok=True)
+        if os.stat(source).st_dev == os.stat(outputdir).st_dev:
+            os.replace(source, target)  # same filesystem: the rename is all there is to do
+            return target, time.perf_counter() - start
+        partial = os.path.join(outputdir, '.' + os.path.basename(source) + '.part')  # hidden: not a video to the stats pass
+        for attempt in range(MOVE_RETRIES):
+            try:
+                digest = hashlib.sha256()
+                with open(source, 'rb') as src, open(partial, 'wb') as dst:
+                    while chunk := src.read(MOVE_CHUNK):
+                        digest.update(chunk)
+                        dst.write(chunk)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                if _sha256(partial) != digest.hexdigest(): raise OSError(f"checksum mismatch after copying to {partial}")
+                shutil.copystat(source, partial)
+                os.replace(partial, target)
+                os.remove(source)
+                return target, time.perf_counter() - start
+            except OSError:
+                with contextlib.suppress(OSError): os.remove(partial)
+                if attempt + 1 == MOVE_RETRIES: raise
+
+    def _done(self, future, item_downloader, info, filename, file_output):
+        try:
+            target, seconds = future.result()
+            item_downloader.stats.add_time('move', seconds)
+            with item_downloader.lock: item_downloader._record_download(info, target, file_output)
+            os.remove(filename + MOVE_SIDECAR)
+        except Exception as e:
+            if self.console: self.pbar.write(f"    Moving {os.path.basename(filename)} failed, left in {STAGE_DIR} for the next run: {e}")
+            with item_downloader.lock: item_downloader.stats.add_failed({})
+        finally:
+            with self.idle:
+                self.outstanding -= 1
+                self.idle.notify_all()
+
+    def join(self):
+        """Wait until every staged file has been moved and recorded."""
+        with self.idle:
+            while self.outstanding: self.idle.wait()
+        self.close()
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+def downloader(data_file, path, download, check_stats, update, wait, stats_file, console, file_output, list_info, nas, stats_jobs=1, full_listing=False, jobs=DOWNLOAD_JOBS, postprocess_workers=POSTPROCESS_WORKERS, dedup=MEDIA_DEDUP, metrics=None, budget=None, stage=False, listings=None):
     """Download the videos from the data file"""
     if not download and not check_stats:
         if console: print("No action specified")
         return
+    start = time.perf_counter()
+    _heavy_imports()
     _warn_if_stale_ytdlp(console)
-    if file_output: apply_review(data_file, console=console)  # consume any edited review.yml first
+    if file_output: apply_review(data_file, console=console)  # consume any edited review files first
+    import ssl
     ssl._create_default_https_context = ssl._create_unverified_context
     with open(data_file, 'r') as file:
         data = yaml.safe_load(file)
         if console: 
             print(f"Downloading {len(data)} channels or playlists")
             print(f"=============================================")
-    pbar = tqdm(data, desc='Total', leave=False, ascii=True)
+    pbar = tqdm(total=len(data), desc='Total', leave=False, ascii=True)
     stats = Stats()
+    scheduler, pipeline, queue, mover = None, None, None, None
     try:
-        for item in pbar:
-            item_downloader = ItemDownloader(item, pbar, path)
-            item_downloader.progress(download=download, stat_checker=check_stats, update=update, wait=wait, console=console, nas=nas, file_output=file_output)
-            stats.add_category(item['name'], item_downloader.finalize(update=True if download else update, console=console, file_output=file_output, list_info=list_info))
+        media = MediaIndex(data, path) if download and dedup else None
+        playlists = media.playlists if media else {}  # already loaded: don't parse every playlist twice
+        queue = WorkQueue(persist=file_output) if download else None
+        resuming = queue.playlists() if queue else set()
+        if check_stats: directory_cache().prescan([os.path.join(path, _location(item)) for item in data])
+        if check_stats and stats_jobs > 1:
+            item_downloaders = _prefetch_stats(data, pbar, path, stats_jobs, playlists=playlists, update=update, wait=wait, console=console, nas=nas, file_output=file_output, full_listing=full_listing, listings=listings)
+        else:
+            item_downloaders = (ItemDownloader(item, pbar, path, playlist_data=playlists.get(item['name'])) for item in data)
+        if download and (jobs > 1 or budget):  # a budgeted run plans every playlist before downloading any
+            scheduler = DownloadScheduler(max(jobs, 1), pbar, wait=wait, file_output=file_output, console=console, budget=budget)
+        if download and postprocess_workers > 0:
+            pipeline = PostprocessPipeline(postprocess_workers, pbar, console=console)
+        if download and stage: mover = StagedMover(pbar, console=console)
+        queued = []
+        for item_downloader in item_downloaders:
+            item_downloader.pipeline = pipeline
+            item_downloader.media = media
+            item_downloader.queue = queue
+            item_downloader.mover = mover
+            if mover: mover.recover(item_downloader, file_output=file_output)
+            if item_downloader.name in resuming: item_downloader.resume(queue.pending(item_downloader.name), console=console)
+            item_downloader.progress(download=download and not scheduler, stat_checker=check_stats and not item_downloader.checked, update=update, wait=wait, console=console, nas=nas, file_output=file_output, full_listing=full_listing, listings=listings)
+            if scheduler and not budget: scheduler.submit(item_downloader)
+            if scheduler or pipeline or mover:
+                queued.append(item_downloader)  # finalized once its downloads are done
+                continue
+            stats.add_category(item_downloader.name, item_downloader.finalize(update=True if download else update, console=console, file_output=file_output, list_info=list_info))
+            pbar.update(1)
+        if scheduler and budget: scheduler.submit_planned(queued)
+        if scheduler: scheduler.join()
+        if pipeline: pipeline.join()
+        if mover: mover.join()
+        for item_downloader in queued:
+            stats.add_category(item_downloader.name, item_downloader.finalize(update=True, console=console, file_output=file_output, list_info=list_info))
+            pbar.update(1)
     except KeyboardInterrupt as e:
         pbar.write("Interrupted by user")
     except DownloadErrorException as e:
@@ -697,11 +2316,220 @@ def downloader(data_file, path, download, check_stats, update, wait, stats_file,
         pbar.write(f"Error: {e}")
         traceback.print_exc()
         pbar.write("Exiting")
-    if check_stats: stats.calculate_globals(pbar, stats_file, console, file_output)
-    shutil.rmtree(TMP_DIR, ignore_errors=True)
+    if scheduler: scheduler.close()
+    if pipeline: pipeline.close()
+    if mover: mover.close()
+    if file_output and download: size_model().save()
+    if file_output:
+        throttle().save()  # a stats pass gets pushback too: its listings follow the pace
+        directory_cache().save()
+    wall = time.perf_counter() - start
+    if check_stats: stats.calculate_globals(pbar, stats_file, console, file_output, wall=wall)
+    if metrics: stats.export_metrics(metrics, wall)
+    if queue: queue.save()
+    if queue and queue.playlists():
+        # keep yt-dlp's partial downloads: the next run resumes these videos mid-file
+        if console: pbar.write(f"{sum(len(queue.pending(name)) for name in queue.playlists())} videos left in {QUEUE_FILE}; run again to resume them")
+    elif (scheduler and scheduler.abandoned) or (pipeline and pipeline.abandoned):
+        if console: pbar.write(f"Keeping {TMP_DIR}: downloads or postprocessing were abandoned mid-way")
+    else: shutil.rmtree(os.path.expanduser(TMP_DIR), ignore_errors=True)
     pbar.close()
     if console: print(f"=============================================")
 
+DAEMON_POLL = 6 * 3600         # seconds between polls of a playlist without a 'poll:' field
+DAEMON_BACKOFF = 2             # a poll that finds nothing new multiplies the playlist's interval by this...
+DAEMON_MAX_BACKOFF = 16        # ...up to this multiple of its 'poll:'
+DAEMON_ERROR_RETRY = 900       # seconds before retrying a playlist whose poll failed
+DAEMON_RELOAD_CHECK = 30       # seconds between data.yml change checks while idle
+DAEMON_STATE_FILE = os.path.join(DATA_PATH, 'daemon.yml')
+DAEMON_STATUS_PORT = 8765      # local JSON status endpoint (--status-port, 0 = off)
+
+_INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+def _parse_interval(value, default=DAEMON_POLL):
+    """A 'poll:' value in seconds: a number, or '30m' / '6h' / '2d' / '1w'."""
+    if value is None: return default
+    if isinstance(value, (int, float)): return float(value)
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*', str(value))
+    if not match: raise ValueError(f"invalid interval {value!r} (use e.g. 3600, '30m', '6h', '2d', '1w')")
+    return float(match.group(1)) * _INTERVAL_UNITS[match.group(2) or 's']
+
+class Daemon:
+    """--daemon: one long-running process instead of a cron job. yt-dlp is imported once and
+    PlaylistData stays in memory (re-read only when its file changes behind our back, e.g. a
+    --triage session). Each data.yml item is checked and downloaded on its own 'poll:'
+    interval; a poll that finds nothing new backs that playlist off (DAEMON_BACKOFF), the
+    first new video resets it. data.yml is reloaded when it changes, the schedule survives
+    restarts (DAEMON_STATE_FILE), and GET http://127.0.0.1:<status_port>/ returns the
+    current playlist / video, the queue depth and the schedule as JSON."""
+    def __init__(self, data_file, path, stats_file, wait=True, console=True, file_output=True, nas=False, metrics=None, status_port=DAEMON_STATUS_PORT):
+        _heavy_imports()
+        self.data_file, self.path, self.stats_file = data_file, path, stats_file
+        self.wait, self.console, self.file_output, self.nas, self.metrics = wait, console, file_output, nas, metrics
+        self.status_port = status_port
+        self.items = {}       # name -> data.yml item
+        self.schedule = {}    # name -> {'next': epoch, 'backoff': n, 'last': epoch, 'error': msg}
+        self.playlists = {}   # name -> (PlaylistData, mtime of its YAML when we last read or wrote it)
+        self.data_mtime = None
+        self.data_error = None
+        self.current = None   # ItemDownloader being polled
+        self.server = None
+        self.stats = Stats()
+        self.started = time.time()
+        self.pbar = tqdm(total=0, desc='Daemon', leave=False, ascii=True)
+        if os.path.exists(DAEMON_STATE_FILE):
+            with open(DAEMON_STATE_FILE, 'r') as file: self.schedule = yaml.safe_load(file) or {}
+
+    def _save_schedule(self):
+        if not self.file_output: return
+        with open(DAEMON_STATE_FILE + '.tmp', 'w') as file: yaml.dump(self.schedule, file)
+        os.replace(DAEMON_STATE_FILE + '.tmp', DAEMON_STATE_FILE)
+
+    def _reload(self):
+        """Re-read data.yml if it changed: new playlists are due at once, removed ones dropped.
+        A file that's missing or doesn't parse (an editor mid-save) keeps the previous items
+        and is tried again on the next check."""
+        try:
+            mtime = os.path.getmtime(self.data_file)
+            if mtime == self.data_mtime: return
+            with open(self.data_file, 'r') as file:
+                items = {item['name']: item for item in yaml.safe_load(file) or []}
+        except (OSError, yaml.YAMLError, KeyError, TypeError) as e:
+            if self.console and str(e) != self.data_error: self.pbar.write(f"Can't read {self.data_file}, keeping the previous list: {e}")
+            self.data_error = str(e)  # said once, not every DAEMON_RELOAD_CHECK
+            return
+        self.items, self.data_mtime, self.data_error = items, mtime, None
+        for name in [name for name in self.schedule if name not in self.items]:
+            del self.schedule[name]
+            self.playlists.pop(name, None)
+        for name in self.items: self.schedule.setdefault(name, {'next': 0, 'backoff': 1})
+        if self.console: self.pbar.write(f"Watching {len(self.items)} channels or playlists from {self.data_file}")
+
+    def _interval(self, name):
+        try: return _parse_interval(self.items[name].get('poll'))
+        except ValueError as e:
+            if self.console: self.pbar.write(f"{name}: {e}; using {DAEMON_POLL}s")
+            return DAEMON_POLL
+
+    def _yaml_mtime(self, name):
+        file = os.path.join(DATA_PATH, name + '.yml')
+        return os.path.getmtime(file) if os.path.exists(file) else None
+
+    def _playlist(self, name):
+        """The in-memory PlaylistData; re-read if another process rewrote its file since."""
+        if STATE_BACKEND == 'sqlite': return open_playlist(name)  # the store is the source of truth
+        cached = self.playlists.get(name)
+        if cached is None or cached[1] != self._yaml_mtime(name):
+            cached = self.playlists[name] = (open_playlist(name), self._yaml_mtime(name))
+        return cached[0]
+
+    def _poll(self, name):
+        """Check and download one playlist; returns whether it had anything new."""
+        item_downloader = ItemDownloader(dict(self.items[name]), self.pbar, self.path, playlist_data=self._playlist(name))
+        self.current = item_downloader
+        try:
+            item_downloader.progress(download=True, stat_checker=True, update=True, wait=self.wait, console=self.console, nas=self.nas, file_output=self.file_output)
+            stats = item_downloader.finalize(update=True, console=self.console, file_output=self.file_output)
+        finally: self.current = None
+        if name in self.playlists: self.playlists[name] = (item_downloader.playlist_data, self._yaml_mtime(name))
+        self.stats.add_category(name, stats)
+        return stats.has_submitted() or stats.has_pending()
+
+    def _next_due(self):
+        """(due time, name) of the playlist to poll next."""
+        return min((entry['next'], name) for name, entry in self.schedule.items())
+
+    def run(self):
+        import signal
+        def stop(signum, frame): raise KeyboardInterrupt
+        signal.signal(signal.SIGTERM, stop)
+        self._serve()
+        try:
+            while True:
+                self._reload()
+                if not self.schedule:
+                    time.sleep(DAEMON_RELOAD_CHECK)
+                    continue
+                due, name = self._next_due()
+                if due > time.time():
+                    time.sleep(min(due - time.time(), DAEMON_RELOAD_CHECK))
+                    continue
+                if self.file_output: apply_review(self.data_file, console=self.console)
+                entry, interval, start = self.schedule[name], self._interval(name), time.perf_counter()
+                try:
+                    new = self._poll(name)
+                    entry['backoff'] = 1 if new else min(entry['backoff'] * DAEMON_BACKOFF, DAEMON_MAX_BACKOFF)
+                    entry.pop('error', None)
+                    entry['next'] = time.time() + interval * entry['backoff']
+                except Exception as e:
+                    self.pbar.write(f"Error polling {name}: {e}")
+                    entry['error'] = str(e)
+                    entry['next'] = time.time() + min(interval, DAEMON_ERROR_RETRY)
+                entry['last'] = time.time()
+                self._save_schedule()
+                self.stats.calculate_globals(self.pbar, self.stats_file, False, self.file_output)
+                if self.metrics: self.stats.export_metrics(self.metrics, time.perf_counter() - start)
+        except KeyboardInterrupt:
+            self.pbar.write("Stopping")
+        finally:
+            if self.server: self.server.shutdown()
+            if self.file_output:
+                throttle().save()
+                size_model().save()
+                directory_cache().save()
+            # a cron run's leftover queue still needs its partial downloads in TMP_DIR
+            if not WorkQueue(persist=False).playlists(): shutil.rmtree(os.path.expanduser(TMP_DIR), ignore_errors=True)
+            self.pbar.close()
+
+    def status(self):
+        now, current = time.time(), self.current
+        schedule = sorted((entry['next'], name, dict(entry)) for name, entry in list(self.schedule.items()))
+        rows = []
+        for due, name, entry in schedule:
+            row = {'name': name, 'due_in': max(0, round(due - now)), 'backoff': entry['backoff']}
+            if 'error' in entry: row['error'] = entry['error']
+            rows.append(row)
+        return {
+            'state': ('downloading' if current.current else 'checking') if current else 'idle',
+            'playlist': current.name if current else None,
+            'video': current.current if current else None,
+            'queue_depth': sum(1 for due, name, _ in schedule if due <= now and not (current and name == current.name)),
+            'uptime': round(now - self.started),
+            'pace': round(throttle().pace, 3),
+            'schedule': rows,
+        }
+
+    def _serve(self):
+        """Serve status() as JSON on 127.0.0.1:status_port from a background thread."""
+        if not self.status_port: return
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        daemon = self
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(daemon.status(), indent=1).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, *args):
+                pass  # the console belongs to the downloader
+        self.server = ThreadingHTTPServer(('127.0.0.1', self.status_port), StatusHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        if self.console: self.pbar.write(f"Status on http://127.0.0.1:{self.status_port}/")
+
+def profile_startup():
+    """--profile-startup: what loading the script costs, and what is deferred to stats/download runs."""
+    loaded = _IMPORT_FINISHED - _IMPORT_STARTED
+    _heavy_imports()
+    print(f"Script load (stdlib, yaml): {loaded * 1000:.0f} ms")
+    for name, seconds in IMPORT_TIMES.items():
+        print(f"{name}: {seconds * 1000:.0f} ms, deferred until a stats or download run needs it")
+    print(f"--triage / --review / --import-db / --export-archives start in ~{loaded * 1000:.0f} ms; "
+          f"-s / -d add ~{sum(IMPORT_TIMES.values()) * 1000:.0f} ms")
+
+_IMPORT_FINISHED = time.perf_counter()
+
 if __name__ == '__main__': 
     usage = """Youtube Downloader
 
@@ -722,7 +2550,7 @@ if __name__ == '__main__':
         run still downloads your other playlists - watching never blocks).
         Triage the pending videos, largest first, either way:
             python3 ytdlp.py --triage    # interactive: [d]ownload / [i]gnore / [s]kip
-            python3 ytdlp.py --review    # write review.yml to batch-edit, applied next run
+            python3 ytdlp.py --review    # write review-NNN.yml to batch-edit, applied next run
         Approved videos download on your next 'python3 ytdlp.py -sd'.
 
     A PO-token provider is required to download most videos. See README.md for the
@@ -738,32 +2566,81 @@ if __name__ == '__main__':
     parser.add_argument("-d", "--download", help="Download the files", default=False, action='store_true')
     parser.add_argument("-w", "--no-wait", help="Don't wait between requests", default=False, action='store_true')
     parser.add_argument("-t", "--triage", help="Interactively triage pending videos from watched playlists", default=False, action='store_true')
-    parser.add_argument("-r", "--review", help="Write pending videos to review.yml for batch triage", default=False, action='store_true')
+    parser.add_argument("-r", "--review", help="Write pending videos to review-001.yml, review-002.yml, ... for batch triage", default=False, action='store_true')
+    parser.add_argument("--top", help="--triage / --review: only the N largest pending videos", default=None, type=int)
+
+    parser.add_argument("--profile-startup", help="Report how long the script and its deferred imports (yt-dlp, tqdm) take to load, and exit", default=False, action='store_true')
+    parser.add_argument("--daemon", help="Keep running: check and download each playlist on its own 'poll:' interval (see README)", default=False, action='store_true')
+    parser.add_argument("--status-port", help="Port of the --daemon JSON status endpoint on 127.0.0.1 (default: "+str(DAEMON_STATUS_PORT)+", 0 = off)", default=DAEMON_STATUS_PORT, type=int)
+    parser.add_argument("--full-listing", help="List every playlist in full, even channels/newest-first playlists that normally stop at the first known videos", default=False, action='store_true')
+    parser.add_argument("--refresh", help="List every playlist again, even if its cached listing is still fresh", default=False, action='store_true')
+    parser.add_argument("--listing-ttl", help="Reuse a playlist's cached flat listing for this long, e.g. '30m' (default: "+str(LISTING_TTL)+" seconds, 0 = never)", default=LISTING_TTL)
+    parser.add_argument("--replay", help="Offline: check stats against the cached listings only, however old", default=False, action='store_true')
+    parser.add_argument("--download-jobs", help="Download this many videos at once, across playlists (default: "+str(DOWNLOAD_JOBS)+")", default=DOWNLOAD_JOBS, type=int)
+    parser.add_argument("--postprocess-workers", help="Run ffmpeg postprocessing in this many background processes while the next video downloads (default: inline)", default=POSTPROCESS_WORKERS, type=int)
+    parser.add_argument("--stage", help="Download and postprocess on the local disk, then copy finished files to the output dir in the background (for -e/--nas)", default=False, action='store_true')
+    parser.add_argument("--no-dedup", help="Download every playlist's videos itself, even ones another playlist already has on disk", default=False, action='store_true')
+    parser.add_argument("-j", "--stats-jobs", help="Check stats of this many playlists at once (default: 1)", default=1, type=int)
 
     subparsers = parser.add_argument_group(title='File Output',
         description='Set the files to output to')
     subparsers.add_argument("-p", "--path", help="The path to download to (default: '"+DEFAULT_PATH+"')", default=DEFAULT_PATH)
     subparsers.add_argument("-i", "--data", "--input", help="The data file to use (default: '"+DATA_FILE+"')", default=DATA_FILE)
     subparsers.add_argument("-o", "--output", help="The stats file to use, only used with -s/--stats (default: '"+STATS_FILE+"')", default=STATS_FILE)
+    subparsers.add_argument("--metrics", help="Also export run timings and counts: a Prometheus textfile if the name ends in .prom, else JSON lines", default=None)
+
+    subparsers = parser.add_argument_group(title='Budget',
+                                       description='Plan the download run after the stats pass and admit videos while they fit (see README)')
+    subparsers.add_argument("--max-gb", help="Download at most about this many GB (estimated) this run", default=None, type=float)
+    subparsers.add_argument("--until", help="Don't start downloads after this local time (HH:MM)", default=None)
+    subparsers.add_argument("--max-time", help="Don't start downloads after this long, e.g. '90m' or '3h'", default=None)
+    subparsers.add_argument("--order", help="Download order: playlist 'weight:' (default), 'smallest' or 'oldest' first", default=None, choices=BUDGET_ORDERS)
+    subparsers.add_argument("--reserve-gb", help="Free space to leave on the target disk (default: "+str(DISK_RESERVE_GB)+")", default=DISK_RESERVE_GB, type=float)
 
     subparsers = parser.add_argument_group(title='Control output',
         description='Control the output of the script')
     subparsers.add_argument("-c", "--no-console", help="Dont output to the console", default=False, action='store_true')
     subparsers.add_argument("-f", "--no-file", help="Dont output to files", default=False, action='store_true')
     subparsers.add_argument("-l", "--list-info", help="Output the full info of the stats", default=False, action='store_true')
+
+    subparsers = parser.add_argument_group(title='State storage',
+        description='Where per-playlist state lives (default: data/<name>.yml + data/<name>.txt)')
+    subparsers.add_argument("--db", help="Keep all playlist state in the SQLite store '"+STATE_DB+"'", default=False, action='store_true')
+    subparsers.add_argument("--import-db", help="Import every playlist's YAML state into '"+STATE_DB+"' and exit", default=False, action='store_true')
+    subparsers.add_argument("--export-archives", help="Write the yt-dlp archive .txt files from '"+STATE_DB+"' and exit", default=False, action='store_true')
     
     args=parser.parse_args()
     # Guardrail: the canonical invocation is -sd; doing nothing is almost always a mistake
     # (a forgotten flag), so fail loudly with usage instead of silently exiting.
-    if not (args.stats or args.download or args.triage or args.review):
+    if not (args.stats or args.download or args.triage or args.review or args.import_db or args.export_archives or args.profile_startup or args.daemon):
         parser.error("nothing to do: pass -s/--stats and/or -d/--download (e.g. -sd), or --triage / --review")
+    if args.db or args.export_archives: STATE_BACKEND = 'sqlite'
     path = NAS_PATH if args.nas else args.path
     if args.download: args.update = True
     console = not args.no_console
     file_output = not args.no_file
-    if args.triage:
-        triage(args.data, file_output=file_output)
+    if args.replay and args.download: parser.error("--replay only replays the stats pass; drop -d/--download")
+    try: listings = ListingCache(ttl=0 if args.refresh else _parse_interval(args.listing_ttl), offline=args.replay)
+    except ValueError as e: parser.error(str(e))
+    budget = None
+    if args.max_gb is not None or args.until or args.max_time or args.order:
+        try:
+            deadlines = ([_parse_clock(args.until)] if args.until else []) + ([time.time() + _parse_interval(args.max_time)] if args.max_time else [])
+        except ValueError as e: parser.error(str(e))
+        if args.download and not args.stats and (args.max_gb is not None or args.order):
+            parser.error("--max-gb and --order size and order the videos the stats pass finds: add -s (e.g. -sd)")
+        budget = DownloadBudget(path, max_gb=args.max_gb, deadline=min(deadlines) if deadlines else None, order=args.order or 'weight', reserve_gb=args.reserve_gb)
+    if args.profile_startup:
+        profile_startup()
+    elif args.import_db:
+        import_state(args.data, console=console)
+    elif args.export_archives:
+        export_archives(args.data, console=console)
+    elif args.triage:
+        triage(args.data, file_output=file_output, top=args.top)
     elif args.review:
-        write_review(args.data)
+        write_review(args.data, top=args.top)
+    elif args.daemon:
+        Daemon(args.data, path, args.output, wait=not args.no_wait, console=console, file_output=file_output, nas=args.nas, metrics=args.metrics, status_port=args.status_port).run()
     else:
-        downloader(args.data, path, download=args.download, check_stats=args.stats, update=args.update, wait=not args.no_wait, stats_file=args.output, console=console, file_output=file_output, list_info=args.list_info, nas=args.nas)
\ No newline at end of file
+        downloader(args.data, path, download=args.download, check_stats=args.stats, update=args.update, wait=not args.no_wait, stats_file=args.output, console=console, file_output=file_output, list_info=args.list_info, nas=args.nas, stats_jobs=args.stats_jobs, full_listing=args.full_listing, jobs=args.download_jobs, postprocess_workers=args.postprocess_workers, dedup=not args.no_dedup, metrics=args.metrics, budget=budget, stage=args.stage, listings=listings)
\ No newline at end of file